@@ -65,6 +65,7 @@ class AgeAnalysisEngine:
     def __init__(self, config: Optional[AgeAnalysisConfig] = None):
         self.config = config or AgeAnalysisConfig.default()
         self.df = None
+        self._series_counts = None
         logger.info("年齡分析引擎初始化完成")
         
     def load_data(self, file_path: str = 'ACNelson_normalized_with_age.csv') -> pd.DataFrame:
@@ -75,13 +76,22 @@ class AgeAnalysisEngine:
             
             # 資料預處理
             self.df['Date'] = pd.to_datetime(self.df['Date'])
-            self.df['Hour'] = pd.to_datetime(self.df['Time'], format='%H:%M:%S').dt.hour
+            # Time 為 'HH:MM:SS' 字串，取前兩碼即為小時，不需解析成完整的 datetime
+            self.df['Hour'] = self.df['Time'].str.slice(0, 2).astype('int8')
             self.df['Month'] = self.df['Date'].dt.month
             self.df['Weekday_Num'] = self.df['Date'].dt.dayofweek
             self.df['Is_Weekend'] = self.df['Weekday_Num'].isin([5, 6])
             
             # 過濾無效資料
-            self.df = self.df[self.df['Rating'] > 0]
+            self.df = self.df[self.df['Rating'] > 0].copy()
+            
+            # 劇集名稱轉為 category，分組與比對改以整數代碼進行
+            # 類別依首次出現順序排列，使 value_counts() 同集數時的排序與字串欄位一致
+            series_names = self.df['Cleaned_Series_Name']
+            self.df['Cleaned_Series_Name'] = pd.Categorical(series_names,
+                                                            categories=series_names.dropna().unique())
+            # 各劇集數在資料重新載入前不會改變，計算一次供各項分析共用
+            self._series_counts = self.df['Cleaned_Series_Name'].value_counts()
             
             logger.info(f"資料載入成功: {len(self.df):,} 筆有效資料")
             logger.info(f"時間範圍: {self.df['Date'].min().date()} 至 {self.df['Date'].max().date()}")
@@ -98,6 +108,14 @@ class AgeAnalysisEngine:
             logger.error(error_msg)
             raise Exception(error_msg)
     
+    def _major_series(self, min_episodes: int, top_n: int) -> pd.Series:
+        """集數達門檻的前 top_n 部劇集數（索引轉回一般字串，輸出結果不帶 category 型別）"""
+        if self._series_counts is None:
+            self._series_counts = self.df['Cleaned_Series_Name'].value_counts()
+        series_counts = self._series_counts
+        major_series = series_counts[series_counts >= min_episodes].head(top_n)
+        return major_series.set_axis(major_series.index.astype(str))
+    
     def analyze_age_preferences(self, min_episodes: int = 50, top_n: int = 10) -> pd.DataFrame:
         """分析年齡偏好，返回標準化資料"""
         if self.df is None:
@@ -106,27 +124,21 @@ class AgeAnalysisEngine:
         logger.info(f"開始分析年齡偏好 (最少{min_episodes}集, 前{top_n}部劇)")
         
         # 找出主要劇集
-        series_counts = self.df['Cleaned_Series_Name'].value_counts()
-        major_series = series_counts[series_counts >= min_episodes].head(top_n)
+        major_series = self._major_series(min_episodes, top_n)
         
         logger.info(f"找到符合條件的劇集: {len(major_series)} 部")
         
-        results = []
-        for series_name in major_series.index:
-            series_data = self.df[self.df['Cleaned_Series_Name'] == series_name]
-            
-            # 計算各年齡層收視率
-            for group_name, columns in self.config.age_groups.items():
-                if columns[0] in series_data.columns:
-                    avg_rating = series_data[columns[0]].mean()
-                    results.append({
-                        'Series': series_name,
-                        'Age_Group': group_name,
-                        'Rating': avg_rating,
-                        'Episodes': len(series_data)
-                    })
-        
-        result_df = pd.DataFrame(results)
+        # 一次分組取得 (劇集 × 年齡層) 平均收視，取代逐劇集篩選
+        group_columns = {group_name: columns[0] for group_name, columns in self.config.age_groups.items()
+                         if columns[0] in self.df.columns}
+        major_data = self.df[self.df['Cleaned_Series_Name'].isin(major_series.index)]
+        series_means = (major_data.groupby('Cleaned_Series_Name', observed=True)[list(group_columns.values())].mean()
+                        .reindex(major_series.index)
+                        .set_axis(list(group_columns), axis=1))
+        
+        result_df = (series_means.rename_axis(index='Series', columns='Age_Group')
+                     .stack().rename('Rating').reset_index())
+        result_df['Episodes'] = major_series.reindex(result_df['Series']).to_numpy()
         logger.info(f"年齡偏好分析完成: {len(result_df)} 筆分析結果")
         return result_df
     
@@ -137,22 +149,24 @@ class AgeAnalysisEngine:
             
         logger.info("開始分析時段人口統計")
         
-        results = []
-        for slot_name, (start_hour, end_hour) in self.config.time_slots.items():
-            slot_data = self.df[self.df['Hour'].between(start_hour, end_hour)]
-            
-            if len(slot_data) > 0:
-                for group_name, columns in self.config.age_groups.items():
-                    if columns[0] in slot_data.columns:
-                        avg_rating = slot_data[columns[0]].mean()
-                        results.append({
-                            'Time_Slot': slot_name,
-                            'Age_Group': group_name,
-                            'Rating': avg_rating,
-                            'Data_Points': len(slot_data)
-                        })
-        
-        result_df = pd.DataFrame(results)
+        # 以 0-23 時對照表一次標記每筆資料的時段，再單次分組計算，取代逐時段篩選
+        slot_names = list(self.config.time_slots)
+        hour_to_slot = np.full(24, -1, dtype=np.int8)
+        for code, (start_hour, end_hour) in enumerate(self.config.time_slots.values()):
+            hour_to_slot[start_hour:end_hour + 1] = code
+        slot_codes = hour_to_slot[self.df['Hour'].to_numpy()]
+        slot_keys = pd.Categorical.from_codes(slot_codes, categories=slot_names)
+        
+        group_columns = {group_name: columns[0] for group_name, columns in self.config.age_groups.items()
+                         if columns[0] in self.df.columns}
+        slot_groups = self.df.groupby(slot_keys, observed=True)
+        slot_sizes = slot_groups.size()
+        slot_means = slot_groups[list(group_columns.values())].mean().set_axis(list(group_columns), axis=1)
+        
+        result_df = (slot_means.rename_axis(index='Time_Slot', columns='Age_Group')
+                     .stack().rename('Rating').reset_index())
+        result_df['Time_Slot'] = result_df['Time_Slot'].astype(str)
+        result_df['Data_Points'] = slot_sizes.reindex(result_df['Time_Slot']).to_numpy()
         logger.info(f"時段分析完成: {len(result_df)} 筆分析結果")
         return result_df
     
@@ -164,7 +178,6 @@ class AgeAnalysisEngine:
         logger.info("開始分析性別差異")
         
         # 整體性別分析
-        overall_results = []
         age_gender_pairs = [
             ('15-24歲', '15-24歲男性', '15-24歲女性'),
             ('25-34歲', '25-34歲男性', '25-34歲女性'),
@@ -173,35 +186,31 @@ class AgeAnalysisEngine:
             ('55歲以上', '55歲以上男性', '55歲以上女性')
         ]
         
-        for age_group, male_col, female_col in age_gender_pairs:
-            if male_col in self.df.columns and female_col in self.df.columns:
-                male_avg = self.df[male_col].mean()
-                female_avg = self.df[female_col].mean()
-                
-                overall_results.extend([
-                    {'Age_Group': age_group, 'Gender': '男性', 'Rating': male_avg},
-                    {'Age_Group': age_group, 'Gender': '女性', 'Rating': female_avg}
-                ])
+        available_pairs = [(age_group, male_col, female_col)
+                           for age_group, male_col, female_col in age_gender_pairs
+                           if male_col in self.df.columns and female_col in self.df.columns]
         
-        # 劇集性別分析
-        series_counts = self.df['Cleaned_Series_Name'].value_counts()
-        major_series = series_counts[series_counts >= 50].head(8)
+        # 一次計算所有性別欄位平均，排成 (年齡層 × 性別) 後直接轉為長表
+        gender_means = self.df[[col for _, male_col, female_col in available_pairs
+                                for col in (male_col, female_col)]].mean().to_numpy()
+        overall_df = (pd.DataFrame(gender_means.reshape(-1, 2),
+                                   index=pd.Index([age_group for age_group, _, _ in available_pairs],
+                                                  name='Age_Group'),
+                                   columns=pd.Index(['男性', '女性'], name='Gender'))
+                      .stack().rename('Rating').reset_index())
         
-        series_results = []
-        for series_name in major_series.index:
-            series_data = self.df[self.df['Cleaned_Series_Name'] == series_name]
-            
-            if '4歲以上男性' in series_data.columns and '4歲以上女性' in series_data.columns:
-                male_rating = series_data['4歲以上男性'].mean()
-                female_rating = series_data['4歲以上女性'].mean()
-                
-                series_results.extend([
-                    {'Series': series_name, 'Gender': '男性', 'Rating': male_rating},
-                    {'Series': series_name, 'Gender': '女性', 'Rating': female_rating}
-                ])
-        
-        overall_df = pd.DataFrame(overall_results)
-        series_df = pd.DataFrame(series_results)
+        # 劇集性別分析
+        major_series = self._major_series(50, 8)
+        
+        if '4歲以上男性' in self.df.columns and '4歲以上女性' in self.df.columns:
+            major_data = self.df[self.df['Cleaned_Series_Name'].isin(major_series.index)]
+            series_df = (major_data.groupby('Cleaned_Series_Name', observed=True)[['4歲以上男性', '4歲以上女性']].mean()
+                         .reindex(major_series.index)
+                         .set_axis(pd.Index(['男性', '女性'], name='Gender'), axis=1)
+                         .rename_axis(index='Series')
+                         .stack().rename('Rating').reset_index())
+        else:
+            series_df = pd.DataFrame()
         
         logger.info(f"性別差異分析完成: 整體{len(overall_df)}筆, 劇集{len(series_df)}筆")
         return overall_df, series_df
@@ -218,8 +227,7 @@ class AgeAnalysisEngine:
         
         # 劇集表現分析
         series_results = []
-        series_counts = self.df['Cleaned_Series_Name'].value_counts()
-        major_series = series_counts[series_counts >= 30].head(12)
+        major_series = self._major_series(30, 12)
         
         for series_name in major_series.index:
             series_data = self.df[self.df['Cleaned_Series_Name'] == series_name]
@@ -264,22 +272,16 @@ class AgeAnalysisEngine:
             
         logger.info("開始分析月份趨勢")
         
-        results = []
-        for month in range(1, 13):
-            month_data = self.df[self.df['Month'] == month]
-            
-            if len(month_data) > 0:
-                for group_name, columns in self.config.age_groups.items():
-                    if columns[0] in month_data.columns:
-                        avg_rating = month_data[columns[0]].mean()
-                        results.append({
-                            'Month': month,
-                            'Age_Group': group_name,
-                            'Rating': avg_rating,
-                            'Data_Points': len(month_data)
-                        })
-        
-        result_df = pd.DataFrame(results)
+        # 一次分組取得 (月份 × 年齡層) 平均收視，再轉為長表
+        group_columns = {group_name: columns[0] for group_name, columns in self.config.age_groups.items()
+                         if columns[0] in self.df.columns}
+        month_groups = self.df[self.df['Month'].between(1, 12)].groupby('Month')
+        month_sizes = month_groups.size()
+        monthly_means = month_groups[list(group_columns.values())].mean().set_axis(list(group_columns), axis=1)
+        
+        result_df = (monthly_means.rename_axis(columns='Age_Group')
+                     .stack().rename('Rating').reset_index())
+        result_df['Data_Points'] = month_sizes.reindex(result_df['Month']).to_numpy()
         logger.info(f"月份趨勢分析完成: {len(result_df)} 筆分析結果")
         return result_df
     
@@ -15,10 +15,8 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Optional, Tuple, List
 import logging
-import warnings
 import os
 
-warnings.filterwarnings('ignore')
 logger = logging.getLogger(__name__)
 
 class VisualizationEngine:
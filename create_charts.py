@@ -17,7 +17,7 @@ def create_visualizations():
     df = pd.read_csv('integrated_program_ratings_cleaned.csv')
     df = df[df['Rating'].notna()]
     df['Date'] = pd.to_datetime(df['Date'])
-    df['Hour'] = pd.to_datetime(df['Time'], format='%H:%M:%S').dt.hour
+    df['Hour'] = df['Time'].str.slice(0, 2).astype('int8')  # 'HH:MM:SS' 取前兩碼即為小時
     
     # 創建圖表
     fig, axes = plt.subplots(2, 2, figsize=(15, 12))
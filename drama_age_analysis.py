@@ -17,22 +17,36 @@ drama_age_analysis.py
 """
 
 import pandas as pd
+import matplotlib
+if __name__ == '__main__':
+    # 以腳本執行時只輸出圖檔，使用非互動式 Agg 後端，省去 GUI 開銷
+    matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 import matplotlib.font_manager as fm
 import re
+import io
+import os
+import sys
+import glob
+import pickle
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime
-import warnings
-warnings.filterwarnings('ignore')
+
+# PyArrow 為選用套件：有安裝時以其多執行緒 CSV 解析器讀檔
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 # 明確設定字體 - 使用多個黑體備選
 def setup_font():
     """設定字體，確保中文顯示正常"""
-    plt.rcParams['font.family'] = 'sans-serif'
-    plt.rcParams['font.sans-serif'] = ['Heiti TC', 'STHeiti', 'SimHei', 'Microsoft JhengHei', 'Arial Unicode MS']
-    plt.rcParams['axes.unicode_minus'] = False
-    
     # 清除字體快取
     plt.rcParams.update(plt.rcParamsDefault)
     plt.rcParams['font.family'] = 'sans-serif'
@@ -70,409 +84,596 @@ GENDER_GROUPS = {
     '55歲以上女性': '55歲以上女性'
 }
 
-def load_and_prepare_data():
-    """載入並準備分析資料"""
-    print("正在載入ACNelson年齡分層收視資料...")
-    
-    df = pd.read_csv('ACNelson_normalized_with_age.csv')
-    df['Date'] = pd.to_datetime(df['Date'])
-    df['Hour'] = pd.to_datetime(df['Time'], format='%H:%M:%S').dt.hour
-    df['Month'] = df['Date'].dt.month
+# 各年齡群組與性別群組對應的資料欄位，方便一次計算多欄平均
+AGE_COLS = [columns[0] for columns in AGE_GROUPS.values()]
+GENDER_COLS = list(GENDER_GROUPS.values())
+
+# 時段定義 (起訖小時皆包含)
+TIME_SLOTS = {
+    '凌晨': (0, 5),
+    '早晨': (6, 11),
+    '午間': (12, 17),
+    '黃金': (18, 22),
+    '深夜': (23, 23)
+}
+
+# 資料來源與分析結果快取目錄
+DATA_FILE = 'ACNelson_normalized_with_age.csv'
+CACHE_DIR = '.analysis_cache'
+
+# 收視率只需計算平均與加總，以 float32 讀入即可，記憶體與頻寬減半
+RATING_COLS = ['Rating'] + AGE_COLS + GENDER_COLS
+# 分析只用到日期、時間、劇名與收視欄位，其餘欄位（節目原名、工作表名等）不必讀入
+LOAD_COLS = ['Date', 'Time', 'Cleaned_Series_Name'] + RATING_COLS
+
+def cached(name, fn, source_files=(DATA_FILE, __file__)):
+    """將 fn() 的結果以 pickle 存於 CACHE_DIR，鍵為輸入檔案的修改時間與大小
+    
+    資料檔或本程式更新後鍵值改變，快取自動失效並重新計算。
+    """
+    stamp = '|'.join(f"{os.path.abspath(path)}:{os.stat(path).st_mtime_ns}:{os.stat(path).st_size}"
+                     for path in source_files)
+    digest = hashlib.md5(f"{name}|{stamp}".encode('utf-8')).hexdigest()[:16]
+    cache_file = os.path.join(CACHE_DIR, f"{name}_{digest}.pkl")
+    
+    if os.path.exists(cache_file):
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    
+    result = fn()
+    
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    for stale_file in glob.glob(os.path.join(CACHE_DIR, f"{name}_*.pkl")):
+        os.remove(stale_file)
+    temp_file = f"{cache_file}.{threading.get_ident()}.tmp"
+    with open(temp_file, 'wb') as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_file, cache_file)
+    return result
+
+# 已準備好的資料（依資料檔修改時間判斷是否仍有效），避免重複讀檔與解析日期
+_DF_CACHE = {}
+
+def _read_prepared_data():
+    """讀取 CSV 並衍生分析所需欄位（不含輸出訊息）"""
+    # Date、Time 明確指定為字串，避免 PyArrow 自動轉成日期/時間型別
+    df = pd.read_csv(DATA_FILE,
+                     usecols=LOAD_COLS,
+                     dtype={'Date': str, 'Time': str, **{col: 'float32' for col in RATING_COLS}},
+                     engine='pyarrow' if PYARROW_AVAILABLE else 'c')
+    df['Date'] = pd.to_datetime(df['Date'], format='%Y-%m-%d', cache=True)
+    # Time 為 'HH:MM:SS' 字串，直接取前兩碼即為小時，不需建立完整的 datetime
+    df['Hour'] = df['Time'].str.slice(0, 2).astype('int8')
+    df['Month'] = df['Date'].dt.month.astype('int8')
     df['Weekday_Num'] = df['Date'].dt.dayofweek
     df['Is_Weekend'] = df['Weekday_Num'].isin([5, 6])
-    
-    # 過濾掉無效資料
-    df = df[df['Rating'] > 0]
-    
-    print(f"✓ 載入完成: {len(df):,} 筆有效資料")
-    print(f"  時間範圍: {df['Date'].min().date()} 至 {df['Date'].max().date()}")
-    print(f"  包含劇集: {df['Cleaned_Series_Name'].nunique()} 部")
-    
+    # 預先切出時段分類欄位，後續以 groupby 取代逐時段篩選
+    # (原始資料的 Time_Slot 欄位為 '00:00~01:00' 格式，故另存為 Time_Period)
+    df['Time_Period'] = pd.cut(df['Hour'],
+                               bins=[-1] + [end for _, end in TIME_SLOTS.values()],
+                               labels=list(TIME_SLOTS))
+    
+    # 過濾掉無效資料（明確複製，後續欄位指派不會作用在原始資料的切片上）
+    df = df.loc[df['Rating'] > 0].copy()
+    
+    # 劇集名稱重複度高，轉為 category 以減少記憶體並加速篩選與分組
+    # 類別依首次出現順序排列，使 value_counts() 同集數時的排序與字串欄位一致
+    series_names = df['Cleaned_Series_Name']
+    df['Cleaned_Series_Name'] = pd.Categorical(series_names,
+                                               categories=series_names.dropna().unique())
     return df
 
-def analyze_age_group_preferences():
+def load_and_prepare_data(verbose=True):
+    """載入並準備分析資料（同一份資料檔只讀取一次，之後直接回傳快取）
+    
+    整理後的資料另以 pickle 存於磁碟快取（保留 float32 與 category 型別），
+    資料檔未變更時，下次執行可跳過 CSV 解析。verbose=False 時不印出載入狀態。
+    """
+    data_mtime = os.stat(DATA_FILE).st_mtime_ns
+    if _DF_CACHE.get('mtime') == data_mtime:
+        # 淺層複製：共用底層資料，呼叫端新增或替換欄位不會影響快取
+        return _DF_CACHE['df'].copy(deep=False)
+    
+    if verbose:
+        print("正在載入ACNelson年齡分層收視資料...")
+    
+    df = cached('prepared_data', _read_prepared_data)
+    
+    if verbose:
+        print(f"✓ 載入完成: {len(df):,} 筆有效資料")
+        print(f"  時間範圍: {df['Date'].min().date()} 至 {df['Date'].max().date()}")
+        # 類別即為過濾後出現過的劇名，數量等同 nunique()，不必再掃描整欄
+        print(f"  包含劇集: {len(df['Cleaned_Series_Name'].cat.categories)} 部")
+    
+    _DF_CACHE['mtime'] = data_mtime
+    _DF_CACHE['df'] = df
+    return df.copy(deep=False)
+
+def shorten_names(names, max_len, suffix='...'):
+    """一次產生截斷後的顯示名稱：超過 max_len 字者截斷並加上 suffix"""
+    names = pd.Index(names, dtype=object)
+    return pd.Index(np.where(names.str.len() > max_len,
+                             names.str.slice(0, max_len) + suffix, names))
+
+def count_series_episodes(df):
+    """計算各劇集集數（由多到少排序），供各項分析共用"""
+    return df['Cleaned_Series_Name'].value_counts()
+
+def get_major_series(series_counts, min_episodes, top_n):
+    """由已計算的集數中選出至少 min_episodes 集的前 top_n 部劇"""
+    return series_counts[series_counts >= min_episodes].head(top_n)
+
+def _compute_age_group_preferences(df, series_counts):
+    """計算主要劇集 (劇集 × 年齡層) 收視率，回傳 (圖表資料, 報表明細)"""
+    major_series = get_major_series(series_counts, 50, 10)
+    
+    # 一次分組計算所有主要劇集的年齡層收視率，避免逐劇掃描整張表
+    # 結果即為 (劇集 × 年齡層) 寬表，可直接供熱力圖使用
+    major_data = df[df['Cleaned_Series_Name'].isin(major_series.index)]
+    age_pref_pivot = (major_data.groupby('Cleaned_Series_Name', observed=True)[AGE_COLS].mean()
+                      .loc[major_series.index]
+                      .set_axis(list(AGE_GROUPS), axis=1)
+                      .rename_axis(index='Series', columns='Age_Group'))
+    
+    chart_pivot = age_pref_pivot.set_axis(shorten_names(age_pref_pivot.index, 10), axis=0)
+    return chart_pivot, {'major_series': major_series, 'age_pref_pivot': age_pref_pivot}
+
+def analyze_age_group_preferences(df=None, series_counts=None, out=None):
     """分析各年齡層收視偏好"""
-    print("\n" + "="*60)
-    print("1. 各年齡層收視偏好分析")
-    print("="*60)
+    print("\n" + "="*60, file=out)
+    print("1. 各年齡層收視偏好分析", file=out)
+    print("="*60, file=out)
     
-    df = load_and_prepare_data()
+    if df is None:
+        df = load_and_prepare_data()
     
     # 計算各年齡層的平均收視率
-    age_stats = {}
-    for group_name, columns in AGE_GROUPS.items():
-        if columns[0] in df.columns:
-            age_stats[group_name] = df[columns[0]].mean()
+    age_means = df[AGE_COLS].mean()
+    age_stats = dict(zip(AGE_GROUPS, age_means))
     
-    print("\n各年齡層整體平均收視率:")
-    print("-" * 40)
+    print("\n各年齡層整體平均收視率:", file=out)
+    print("-" * 40, file=out)
     for group, rating in sorted(age_stats.items(), key=lambda x: x[1], reverse=True):
-        print(f"{group:<10} {rating:.4f}")
+        print(f"{group:<10} {rating:.4f}", file=out)
     
     # 分析主要劇集的年齡偏好
-    series_counts = df['Cleaned_Series_Name'].value_counts()
-    major_series = series_counts[series_counts >= 50].head(10)
-    
-    print(f"\n主要劇集年齡層偏好分析 (>=50集的前10部劇):")
-    print("=" * 80)
+    if series_counts is None:
+        series_counts = count_series_episodes(df)
+    chart_pivot, details = _compute_age_group_preferences(df, series_counts)
+    major_series = details['major_series']
+    age_pref_pivot = details['age_pref_pivot']
     
-    age_preference_data = []
+    print(f"\n主要劇集年齡層偏好分析 (>=50集的前10部劇):", file=out)
+    print("=" * 80, file=out)
     
     for series_name in major_series.index:
-        series_data = df[df['Cleaned_Series_Name'] == series_name]
-        
-        print(f"\n{series_name} (共{len(series_data)}集):")
-        print("-" * 50)
-        
+        print(f"\n{series_name} (共{major_series[series_name]}集):", file=out)
+        print("-" * 50, file=out)
+    
         # 計算各年齡層收視率
-        series_age_stats = {}
-        for group_name, columns in AGE_GROUPS.items():
-            if columns[0] in series_data.columns:
-                avg_rating = series_data[columns[0]].mean()
-                series_age_stats[group_name] = avg_rating
-                print(f"  {group_name:<10} {avg_rating:.4f}")
-        
+        series_age_stats = age_pref_pivot.loc[series_name]
+        for group_name, avg_rating in series_age_stats.items():
+            print(f"  {group_name:<10} {avg_rating:.4f}", file=out)
+    
         # 找出主要觀眾群
-        if series_age_stats:
-            max_group = max(series_age_stats, key=series_age_stats.get)
-            max_rating = series_age_stats[max_group]
-            print(f"  → 主要觀眾群: {max_group} ({max_rating:.4f})")
-            
-            # 儲存資料供視覺化使用
-            for group, rating in series_age_stats.items():
-                age_preference_data.append({
-                    'Series': series_name[:10] + '...' if len(series_name) > 10 else series_name,
-                    'Age_Group': group,
-                    'Rating': rating
-                })
-    
-    return pd.DataFrame(age_preference_data)
-
-def analyze_time_slot_demographics():
+        max_group = series_age_stats.idxmax()
+        max_rating = series_age_stats[max_group]
+        print(f"  → 主要觀眾群: {max_group} ({max_rating:.4f})", file=out)
+    
+    return chart_pivot
+
+def _compute_time_slot_demographics(df):
+    """計算 (時段 × 年齡層) 收視率，回傳 (圖表資料, 報表明細)"""
+    # 一次分組計算所有時段的各年齡層收視率，結果即為 (時段 × 年齡層) 寬表
+    slot_groups = df.groupby('Time_Period', observed=True)
+    slot_sizes = slot_groups.size()
+    time_age_pivot = (slot_groups[AGE_COLS].mean()
+                      .set_axis(list(AGE_GROUPS), axis=1)
+                      .rename_axis(index='Time_Slot', columns='Age_Group'))
+    return time_age_pivot, {'slot_sizes': slot_sizes}
+
+def analyze_time_slot_demographics(df=None, out=None):
     """分析不同時段的年齡分布"""
-    print("\n" + "="*60)
-    print("2. 時段年齡分布分析")
-    print("="*60)
+    print("\n" + "="*60, file=out)
+    print("2. 時段年齡分布分析", file=out)
+    print("="*60, file=out)
     
-    df = load_and_prepare_data()
+    if df is None:
+        df = load_and_prepare_data()
     
-    # 定義時段
-    time_slots = {
-        '凌晨': (0, 5),
-        '早晨': (6, 11),
-        '午間': (12, 17),
-        '黃金': (18, 22),
-        '深夜': (23, 23)
-    }
+    print("\n各時段年齡層收視率分析:", file=out)
+    print("=" * 80, file=out)
     
-    print("\n各時段年齡層收視率分析:")
-    print("=" * 80)
+    time_age_pivot, details = _compute_time_slot_demographics(df)
+    slot_sizes = details['slot_sizes']
     
-    time_age_data = []
+    for slot_name, (start_hour, end_hour) in TIME_SLOTS.items():
+        if slot_name in time_age_pivot.index:
+            print(f"\n{slot_name}時段 ({start_hour}-{end_hour}點, {slot_sizes[slot_name]:,}筆資料):", file=out)
+            print("-" * 40, file=out)
     
-    for slot_name, (start_hour, end_hour) in time_slots.items():
-        slot_data = df[df['Hour'].between(start_hour, end_hour)]
-        
-        if len(slot_data) > 0:
-            print(f"\n{slot_name}時段 ({start_hour}-{end_hour}點, {len(slot_data):,}筆資料):")
-            print("-" * 40)
-            
             # 計算各年齡層收視率
-            for group_name, columns in AGE_GROUPS.items():
-                if columns[0] in slot_data.columns:
-                    avg_rating = slot_data[columns[0]].mean()
-                    print(f"  {group_name:<10} {avg_rating:.4f}")
-                    
-                    time_age_data.append({
-                        'Time_Slot': slot_name,
-                        'Age_Group': group_name,
-                        'Rating': avg_rating
-                    })
+            for group_name, avg_rating in time_age_pivot.loc[slot_name].items():
+                print(f"  {group_name:<10} {avg_rating:.4f}", file=out)
     
     # 找出各年齡層最佳時段
-    print("\n各年齡層最佳收視時段:")
-    print("-" * 40)
+    print("\n各年齡層最佳收視時段:", file=out)
+    print("-" * 40, file=out)
     
-    time_age_df = pd.DataFrame(time_age_data)
-    for group in AGE_GROUPS.keys():
-        group_data = time_age_df[time_age_df['Age_Group'] == group]
-        if len(group_data) > 0:
-            best_slot = group_data.loc[group_data['Rating'].idxmax()]
-            print(f"{group:<10} → {best_slot['Time_Slot']}時段 ({best_slot['Rating']:.4f})")
+    if not time_age_pivot.empty:
+        for group, best_slot in time_age_pivot.idxmax().items():
+            print(f"{group:<10} → {best_slot}時段 ({time_age_pivot.at[best_slot, group]:.4f})", file=out)
     
-    return time_age_df
+    return time_age_pivot
 
-def analyze_gender_differences():
+def _compute_gender_differences(df, series_counts):
+    """計算 (年齡層 × 性別) 與主要劇集 (劇集 × 性別) 收視率，回傳 (圖表資料, 報表明細)"""
+    age_gender_pairs = [
+        ('15-24歲', '15-24歲男性', '15-24歲女性'),
+        ('25-34歲', '25-34歲男性', '25-34歲女性'),
+        ('35-44歲', '35-44歲男性', '35-44歲女性'),
+        ('45-54歲', '45-54歲男性', '45-54歲女性'),
+        ('55歲以上', '55歲以上男性', '55歲以上女性')
+    ]
+    
+    # 一次計算所有性別欄位平均，組成 (年齡層 × 性別) 寬表供圖表使用
+    gender_means = df[GENDER_COLS].mean()
+    gender_pivot = pd.DataFrame(
+        {'男性': [gender_means[male_col] for _, male_col, _ in age_gender_pairs],
+         '女性': [gender_means[female_col] for _, _, female_col in age_gender_pairs]},
+        index=pd.Index([age_group for age_group, _, _ in age_gender_pairs], name='Age_Group'))
+    gender_pivot.columns.name = 'Gender'
+    
+    major_series = get_major_series(series_counts, 50, 8)
+    
+    # 一次分組取得 (劇集 × 性別) 寬表
+    major_data = df[df['Cleaned_Series_Name'].isin(major_series.index)]
+    series_gender_pivot = (major_data.groupby('Cleaned_Series_Name', observed=True)[
+                               ['4歲以上男性', '4歲以上女性']].mean()
+                           .loc[major_series.index]
+                           .set_axis(['男性', '女性'], axis=1)
+                           .rename_axis(index='Series', columns='Gender'))
+    
+    chart_series_pivot = series_gender_pivot.set_axis(shorten_names(series_gender_pivot.index, 12), axis=0)
+    return (gender_pivot, chart_series_pivot), {'series_gender_pivot': series_gender_pivot}
+
+def analyze_gender_differences(df=None, series_counts=None, out=None):
     """分析性別收視差異"""
-    print("\n" + "="*60)
-    print("3. 性別收視差異分析")
-    print("="*60)
+    print("\n" + "="*60, file=out)
+    print("3. 性別收視差異分析", file=out)
+    print("="*60, file=out)
     
-    df = load_and_prepare_data()
+    if df is None:
+        df = load_and_prepare_data()
     
     # 整體性別差異
-    print("\n整體性別收視率比較:")
-    print("-" * 30)
+    print("\n整體性別收視率比較:", file=out)
+    print("-" * 30, file=out)
     
     overall_male = df['4歲以上男性'].mean()
     overall_female = df['4歲以上女性'].mean()
     
-    print(f"男性觀眾: {overall_male:.4f}")
-    print(f"女性觀眾: {overall_female:.4f}")
-    print(f"差異: {abs(overall_male - overall_female):.4f} ({'女性較高' if overall_female > overall_male else '男性較高'})")
+    print(f"男性觀眾: {overall_male:.4f}", file=out)
+    print(f"女性觀眾: {overall_female:.4f}", file=out)
+    print(f"差異: {abs(overall_male - overall_female):.4f} ({'女性較高' if overall_female > overall_male else '男性較高'})", file=out)
+    
+    if series_counts is None:
+        series_counts = count_series_episodes(df)
+    (gender_pivot, chart_series_pivot), details = _compute_gender_differences(df, series_counts)
+    series_gender_pivot = details['series_gender_pivot']
     
     # 各年齡層性別差異
-    print("\n各年齡層性別差異:")
-    print("-" * 50)
-    print("年齡層      男性    女性    差異    偏向")
-    print("-" * 50)
+    print("\n各年齡層性別差異:", file=out)
+    print("-" * 50, file=out)
+    print("年齡層      男性    女性    差異    偏向", file=out)
+    print("-" * 50, file=out)
     
-    gender_analysis_data = []
+    age_diff = (gender_pivot['女性'] - gender_pivot['男性']).abs()
+    age_bias = np.where(gender_pivot['女性'] > gender_pivot['男性'], '女性', '男性')
     
-    age_gender_pairs = [
-        ('15-24歲', '15-24歲男性', '15-24歲女性'),
-        ('25-34歲', '25-34歲男性', '25-34歲女性'),
-        ('35-44歲', '35-44歲男性', '35-44歲女性'),
-        ('45-54歲', '45-54歲男性', '45-54歲女性'),
-        ('55歲以上', '55歲以上男性', '55歲以上女性')
-    ]
-    
-    for age_group, male_col, female_col in age_gender_pairs:
-        if male_col in df.columns and female_col in df.columns:
-            male_avg = df[male_col].mean()
-            female_avg = df[female_col].mean()
-            diff = abs(male_avg - female_avg)
-            bias = '女性' if female_avg > male_avg else '男性'
-            
-            print(f"{age_group:<10} {male_avg:.4f}  {female_avg:.4f}  {diff:.4f}   {bias}")
-            
-            gender_analysis_data.extend([
-                {'Age_Group': age_group, 'Gender': '男性', 'Rating': male_avg},
-                {'Age_Group': age_group, 'Gender': '女性', 'Rating': female_avg}
-            ])
+    for (age_group, male_avg, female_avg), diff, bias in zip(gender_pivot.itertuples(), age_diff, age_bias):
+        print(f"{age_group:<10} {male_avg:.4f}  {female_avg:.4f}  {diff:.4f}   {bias}", file=out)
     
     # 主要劇集的性別偏好
-    print("\n主要劇集性別偏好分析:")
-    print("=" * 50)
+    print("\n主要劇集性別偏好分析:", file=out)
+    print("=" * 50, file=out)
     
-    series_counts = df['Cleaned_Series_Name'].value_counts()
-    major_series = series_counts[series_counts >= 50].head(8)
+    # 偏向與差異以向量運算求出
+    series_diff = (series_gender_pivot['女性'] - series_gender_pivot['男性']).abs()
+    series_bias = np.where(series_gender_pivot['女性'] > series_gender_pivot['男性'], '女性向', '男性向')
     
-    series_gender_data = []
+    for (series_name, male_rating, female_rating), diff, bias in zip(
+            series_gender_pivot.itertuples(), series_diff, series_bias):
+        print(f"{series_name[:15]:<15} 男:{male_rating:.4f} 女:{female_rating:.4f} → {bias} (差異:{diff:.4f})", file=out)
     
+    return gender_pivot, chart_series_pivot
+
+def _day_type_long_form(key_name, keys, weekday_values, weekend_values):
+    """將週間/週末兩組數值直接排成長表（每個鍵依序為週間、週末兩列），不逐列建立 dict"""
+    n = len(keys)
+    ratings = np.empty(2 * n, dtype='float32')
+    ratings[0::2] = weekday_values
+    ratings[1::2] = weekend_values
+    return pd.DataFrame({
+        key_name: pd.Categorical(np.repeat(keys, 2), categories=keys),
+        'Day_Type': pd.Categorical(np.tile(['週間', '週末'], n), categories=['週間', '週末']),
+        'Rating': ratings
+    })
+
+# 週間vs週末時段比較的顯示名稱 → Time_Period 分類
+WEEKDAY_WEEKEND_SLOTS = {
+    '早晨(6-11)': '早晨',
+    '午間(12-17)': '午間',
+    '黃金(18-22)': '黃金',
+    '深夜(23-1)': '深夜'
+}
+
+def _compute_weekday_weekend_performance(df, series_counts):
+    """計算週間/週末的劇集、年齡層與時段收視率，回傳 (圖表資料, 報表明細)"""
+    # 週末遮罩只建立一次，週間/週末資料也只切一次（僅保留年齡層欄位），供整體與年齡層分析共用
+    weekend_mask = df['Is_Weekend'].to_numpy(dtype=bool)
+    weekday_age_means = df.loc[~weekend_mask, AGE_COLS].mean()
+    weekend_age_means = df.loc[weekend_mask, AGE_COLS].mean()
+    
+    major_series = get_major_series(series_counts, 30, 12)  # 至少30集的前12部劇
+    
+    # 以 (劇集, 是否週末) 一次分組，取得每部劇週間/週末的平均收視與集數
+    major_data = df[df['Cleaned_Series_Name'].isin(major_series.index)]
+    series_day_groups = major_data.groupby(['Cleaned_Series_Name', 'Is_Weekend'], observed=True)['4歲以上']
+    series_day_means = series_day_groups.mean().unstack('Is_Weekend').reindex(columns=[False, True])
+    series_day_sizes = series_day_groups.size().unstack('Is_Weekend', fill_value=0).reindex(
+        columns=[False, True], fill_value=0)
+    
+    # 差異與偏向一次以向量運算求出
+    series_weekday = series_day_means.loc[:, False]
+    series_weekend = series_day_means.loc[:, True]
+    series_diffs = (series_weekday - series_weekend).abs()
+    series_prefs = pd.Series(np.where(series_weekend > series_weekday, '週末', '週間'),
+                             index=series_day_means.index)
+    
+    # 只比較週間與週末都有播出的劇集
+    series_performance = []
     for series_name in major_series.index:
-        series_data = df[df['Cleaned_Series_Name'] == series_name]
-        
-        male_rating = series_data['4歲以上男性'].mean()
-        female_rating = series_data['4歲以上女性'].mean()
-        
-        bias = '女性向' if female_rating > male_rating else '男性向'
-        diff = abs(male_rating - female_rating)
-        
-        print(f"{series_name[:15]:<15} 男:{male_rating:.4f} 女:{female_rating:.4f} → {bias} (差異:{diff:.4f})")
-        
-        series_gender_data.extend([
-            {'Series': series_name[:12] + '...' if len(series_name) > 12 else series_name, 
-             'Gender': '男性', 'Rating': male_rating},
-            {'Series': series_name[:12] + '...' if len(series_name) > 12 else series_name, 
-             'Gender': '女性', 'Rating': female_rating}
-        ])
+        weekday_episodes = series_day_sizes.at[series_name, False]
+        weekend_episodes = series_day_sizes.at[series_name, True]
     
-    return pd.DataFrame(gender_analysis_data), pd.DataFrame(series_gender_data)
+        if weekday_episodes > 0 and weekend_episodes > 0:
+            series_performance.append({
+                'Series': series_name,
+                'Weekday_Rating': series_weekday[series_name],
+                'Weekend_Rating': series_weekend[series_name],
+                'Difference': series_diffs[series_name],
+                'Preference': series_prefs[series_name],
+                'Total_Episodes': major_series[series_name],
+                'Weekday_Episodes': weekday_episodes,
+                'Weekend_Episodes': weekend_episodes
+            })
+    
+    # 圖表資料直接取自分組結果：(劇集 × 週間/週末) 寬表
+    weekday_weekend_pivot = (series_day_means.loc[[perf['Series'] for perf in series_performance]]
+                             .set_axis(['週間', '週末'], axis=1)
+                             .rename_axis(index='Series', columns='Day_Type'))
+    weekday_weekend_pivot.index = shorten_names(weekday_weekend_pivot.index, 15, '..')
+    
+    age_weekday_weekend_data = _day_type_long_form('Age_Group', list(AGE_GROUPS),
+                                                   weekday_age_means[AGE_COLS].to_numpy(),
+                                                   weekend_age_means[AGE_COLS].to_numpy())
+    
+    # 深夜時段跨日 (23-1點)，將 0、1 點併入深夜後一次分組
+    period = df['Time_Period'].mask(df['Hour'] <= 1, '深夜')
+    slot_day_means = df['4歲以上'].groupby([period, weekend_mask], observed=True).mean().unstack()
+    
+    present_slots = [slot_name for slot_name, period_name in WEEKDAY_WEEKEND_SLOTS.items()
+                     if period_name in slot_day_means.index]
+    slot_means = slot_day_means.loc[[WEEKDAY_WEEKEND_SLOTS[slot_name] for slot_name in present_slots]]
+    slot_weekday_values = slot_means.loc[:, False].to_numpy()
+    slot_weekend_values = slot_means.loc[:, True].to_numpy()
+    
+    time_weekday_weekend_data = _day_type_long_form('Time_Slot', present_slots,
+                                                    slot_weekday_values, slot_weekend_values)
+    
+    chart_data = (weekday_weekend_pivot,
+                  age_weekday_weekend_data,
+                  time_weekday_weekend_data,
+                  series_performance)
+    details = {
+        'weekday_age_means': weekday_age_means,
+        'weekend_age_means': weekend_age_means,
+        'present_slots': present_slots,
+        'slot_weekday_values': slot_weekday_values,
+        'slot_weekend_values': slot_weekend_values,
+    }
+    return chart_data, details
 
-def analyze_weekday_weekend_performance():
+def analyze_weekday_weekend_performance(df=None, series_counts=None, out=None):
     """分析同一部戲劇在週間和週末的收視表現"""
-    print("\n" + "="*60)
-    print("4. 週間vs週末收視表現分析")
-    print("="*60)
+    print("\n" + "="*60, file=out)
+    print("4. 週間vs週末收視表現分析", file=out)
+    print("="*60, file=out)
     
-    df = load_and_prepare_data()
+    if df is None:
+        df = load_and_prepare_data()
+    if series_counts is None:
+        series_counts = count_series_episodes(df)
     
-    # 計算整體週間vs週末表現
-    weekday_data = df[~df['Is_Weekend']]
-    weekend_data = df[df['Is_Weekend']]
+    chart_data, details = _compute_weekday_weekend_performance(df, series_counts)
+    series_performance = chart_data[3]
+    weekday_age_means = details['weekday_age_means']
+    weekend_age_means = details['weekend_age_means']
     
-    overall_weekday = weekday_data['4歲以上'].mean()
-    overall_weekend = weekend_data['4歲以上'].mean()
+    # 計算整體週間vs週末表現
+    overall_weekday = weekday_age_means['4歲以上']
+    overall_weekend = weekend_age_means['4歲以上']
     
-    print("\n整體收視表現比較:")
-    print("-" * 40)
-    print(f"週間平均收視率: {overall_weekday:.4f}")
-    print(f"週末平均收視率: {overall_weekend:.4f}")
-    print(f"差異: {abs(overall_weekday - overall_weekend):.4f} ({'週末較高' if overall_weekend > overall_weekday else '週間較高'})")
+    print("\n整體收視表現比較:", file=out)
+    print("-" * 40, file=out)
+    print(f"週間平均收視率: {overall_weekday:.4f}", file=out)
+    print(f"週末平均收視率: {overall_weekend:.4f}", file=out)
+    print(f"差異: {abs(overall_weekday - overall_weekend):.4f} ({'週末較高' if overall_weekend > overall_weekday else '週間較高'})", file=out)
     
     # 分析主要劇集的週間vs週末表現
-    series_counts = df['Cleaned_Series_Name'].value_counts()
-    major_series = series_counts[series_counts >= 30].head(12)  # 至少30集的前12部劇
+    print(f"\n主要劇集週間vs週末收視比較 (>=30集的前12部劇):", file=out)
+    print("=" * 90, file=out)
+    print(f"{'劇集名稱':<20} {'週間收視':<10} {'週末收視':<10} {'差異':<8} {'偏向':<8} {'集數':<6}", file=out)
+    print("-" * 90, file=out)
     
-    print(f"\n主要劇集週間vs週末收視比較 (>=30集的前12部劇):")
-    print("=" * 90)
-    print(f"{'劇集名稱':<20} {'週間收視':<10} {'週末收視':<10} {'差異':<8} {'偏向':<8} {'集數':<6}")
-    print("-" * 90)
+    short_names = shorten_names([perf['Series'] for perf in series_performance], 18, '..')
+    for short_name, perf in zip(short_names, series_performance):
+        print(f"{short_name:<20} {perf['Weekday_Rating']:<10.4f} {perf['Weekend_Rating']:<10.4f} "
+              f"{perf['Difference']:<8.4f} {perf['Preference']:<8} {perf['Total_Episodes']:<6}", file=out)
     
-    weekday_weekend_data = []
-    series_performance = []
+    # 分析不同年齡層的週間vs週末偏好
+    print(f"\n不同年齡層週間vs週末收視偏好:", file=out)
+    print("-" * 60, file=out)
+    print(f"{'年齡層':<12} {'週間收視':<10} {'週末收視':<10} {'差異':<8} {'偏向':<8}", file=out)
+    print("-" * 60, file=out)
     
-    for series_name in major_series.index:
-        series_data = df[df['Cleaned_Series_Name'] == series_name]
-        
-        series_weekday = series_data[~series_data['Is_Weekend']]
-        series_weekend = series_data[series_data['Is_Weekend']]
-        
-        if len(series_weekday) > 0 and len(series_weekend) > 0:
-            weekday_rating = series_weekday['4歲以上'].mean()
-            weekend_rating = series_weekend['4歲以上'].mean()
-            
-            diff = abs(weekday_rating - weekend_rating)
-            preference = '週末' if weekend_rating > weekday_rating else '週間'
-            total_episodes = len(series_data)
-            
-            series_short_name = series_name[:18] + '..' if len(series_name) > 18 else series_name
-            print(f"{series_short_name:<20} {weekday_rating:<10.4f} {weekend_rating:<10.4f} {diff:<8.4f} {preference:<8} {total_episodes:<6}")
-            
-            # 儲存資料供視覺化使用
-            weekday_weekend_data.extend([
-                {
-                    'Series': series_name[:15] + '..' if len(series_name) > 15 else series_name,
-                    'Day_Type': '週間',
-                    'Rating': weekday_rating,
-                    'Episodes': len(series_weekday)
-                },
-                {
-                    'Series': series_name[:15] + '..' if len(series_name) > 15 else series_name,
-                    'Day_Type': '週末',
-                    'Rating': weekend_rating,
-                    'Episodes': len(series_weekend)
-                }
-            ])
-            
-            series_performance.append({
-                'Series': series_name,
-                'Weekday_Rating': weekday_rating,
-                'Weekend_Rating': weekend_rating,
-                'Difference': diff,
-                'Preference': preference,
-                'Total_Episodes': total_episodes,
-                'Weekday_Episodes': len(series_weekday),
-                'Weekend_Episodes': len(series_weekend)
-            })
+    age_diffs = (weekday_age_means - weekend_age_means).abs()
+    age_prefs = np.where(weekend_age_means > weekday_age_means, '週末', '週間')
     
-    # 分析不同年齡層的週間vs週末偏好
-    print(f"\n不同年齡層週間vs週末收視偏好:")
-    print("-" * 60)
-    print(f"{'年齡層':<12} {'週間收視':<10} {'週末收視':<10} {'差異':<8} {'偏向':<8}")
-    print("-" * 60)
-    
-    age_weekday_weekend_data = []
-    
-    for group_name, columns in AGE_GROUPS.items():
-        if columns[0] in df.columns:
-            weekday_age = weekday_data[columns[0]].mean()
-            weekend_age = weekend_data[columns[0]].mean()
-            diff_age = abs(weekday_age - weekend_age)
-            pref_age = '週末' if weekend_age > weekday_age else '週間'
-            
-            print(f"{group_name:<12} {weekday_age:<10.4f} {weekend_age:<10.4f} {diff_age:<8.4f} {pref_age:<8}")
-            
-            age_weekday_weekend_data.extend([
-                {'Age_Group': group_name, 'Day_Type': '週間', 'Rating': weekday_age},
-                {'Age_Group': group_name, 'Day_Type': '週末', 'Rating': weekend_age}
-            ])
+    for group_name, col, pref_age in zip(AGE_GROUPS, AGE_COLS, age_prefs):
+        weekday_age = weekday_age_means[col]
+        weekend_age = weekend_age_means[col]
+        diff_age = age_diffs[col]
     
-    # 時段分析
-    print(f"\n不同時段週間vs週末收視比較:")
-    print("-" * 50)
-    
-    time_slots = {
-        '早晨(6-11)': (6, 11),
-        '午間(12-17)': (12, 17),
-        '黃金(18-22)': (18, 22),
-        '深夜(23-1)': (23, 1)
-    }
+        print(f"{group_name:<12} {weekday_age:<10.4f} {weekend_age:<10.4f} {diff_age:<8.4f} {pref_age:<8}", file=out)
     
-    time_weekday_weekend_data = []
+    # 時段分析
+    print(f"\n不同時段週間vs週末收視比較:", file=out)
+    print("-" * 50, file=out)
     
-    for slot_name, (start_hour, end_hour) in time_slots.items():
-        if start_hour <= end_hour:
-            slot_data = df[df['Hour'].between(start_hour, end_hour)]
-        else:  # 跨日情況 (深夜)
-            slot_data = df[(df['Hour'] >= start_hour) | (df['Hour'] <= end_hour)]
-        
-        if len(slot_data) > 0:
-            slot_weekday = slot_data[~slot_data['Is_Weekend']]['4歲以上'].mean()
-            slot_weekend = slot_data[slot_data['Is_Weekend']]['4歲以上'].mean()
-            
-            print(f"{slot_name:<12} 週間:{slot_weekday:.4f} 週末:{slot_weekend:.4f}")
-            
-            time_weekday_weekend_data.extend([
-                {'Time_Slot': slot_name, 'Day_Type': '週間', 'Rating': slot_weekday},
-                {'Time_Slot': slot_name, 'Day_Type': '週末', 'Rating': slot_weekend}
-            ])
+    for slot_name, slot_weekday, slot_weekend in zip(details['present_slots'],
+                                                     details['slot_weekday_values'],
+                                                     details['slot_weekend_values']):
+        print(f"{slot_name:<12} 週間:{slot_weekday:.4f} 週末:{slot_weekend:.4f}", file=out)
     
     # 統計摘要
     weekend_preferred = sum(1 for perf in series_performance if perf['Preference'] == '週末')
     weekday_preferred = len(series_performance) - weekend_preferred
     
-    print(f"\n📊 週間vs週末表現統計:")
-    print("-" * 40)
-    print(f"偏好週末播出的劇集: {weekend_preferred} 部")
-    print(f"偏好週間播出的劇集: {weekday_preferred} 部")
-    print(f"最大收視差異: {max([perf['Difference'] for perf in series_performance]):.4f}")
-    print(f"平均收視差異: {sum([perf['Difference'] for perf in series_performance])/len(series_performance):.4f}")
+    print(f"\n📊 週間vs週末表現統計:", file=out)
+    print("-" * 40, file=out)
+    print(f"偏好週末播出的劇集: {weekend_preferred} 部", file=out)
+    print(f"偏好週間播出的劇集: {weekday_preferred} 部", file=out)
+    print(f"最大收視差異: {max([perf['Difference'] for perf in series_performance]):.4f}", file=out)
+    print(f"平均收視差異: {sum([perf['Difference'] for perf in series_performance])/len(series_performance):.4f}", file=out)
     
-    return (pd.DataFrame(weekday_weekend_data), 
-            pd.DataFrame(age_weekday_weekend_data), 
-            pd.DataFrame(time_weekday_weekend_data),
-            series_performance)
+    return chart_data
 
-def analyze_monthly_age_trends():
+def _compute_monthly_age_trends(df):
+    """計算 (月份 × 年齡層) 收視率，回傳 (圖表資料, 報表明細)"""
+    # 一次分組取得 (月份 × 年齡層) 寬表，供列印與趨勢圖使用
+    month_groups = df.groupby('Month')
+    month_sizes = month_groups.size()
+    monthly_pivot = (month_groups[AGE_COLS].mean()
+                     .set_axis(list(AGE_GROUPS), axis=1)
+                     .rename_axis(index='Month', columns='Age_Group'))
+    return monthly_pivot, {'month_sizes': month_sizes}
+
+def analyze_monthly_age_trends(df=None, out=None):
     """分析月份年齡趨勢"""
-    print("\n" + "="*60)
-    print("5. 月份年齡趨勢分析")
-    print("="*60)
+    print("\n" + "="*60, file=out)
+    print("5. 月份年齡趨勢分析", file=out)
+    print("="*60, file=out)
     
-    df = load_and_prepare_data()
+    if df is None:
+        df = load_and_prepare_data()
     
-    print("\n各月份年齡層收視率變化:")
-    print("=" * 70)
+    print("\n各月份年齡層收視率變化:", file=out)
+    print("=" * 70, file=out)
     
-    monthly_age_data = []
+    monthly_pivot, details = _compute_monthly_age_trends(df)
+    month_sizes = details['month_sizes']
     
-    for month in range(1, 13):
-        month_data = df[df['Month'] == month]
-        
-        if len(month_data) > 0:
-            print(f"\n{month}月 ({len(month_data):,}筆資料):")
-            print("-" * 30)
-            
-            for group_name, columns in AGE_GROUPS.items():
-                if columns[0] in month_data.columns:
-                    avg_rating = month_data[columns[0]].mean()
-                    print(f"  {group_name:<10} {avg_rating:.4f}")
-                    
-                    monthly_age_data.append({
-                        'Month': month,
-                        'Age_Group': group_name,
-                        'Rating': avg_rating
-                    })
+    # 月份 × 年齡層的明細逐行組成字串，最後一次寫出，取代上百次 print()
+    lines = []
+    for month, month_means in monthly_pivot.iterrows():
+        lines.append(f"\n{month}月 ({month_sizes[month]:,}筆資料):")
+        lines.append("-" * 30)
+        lines.extend(f"  {group_name:<10} {avg_rating:.4f}" for group_name, avg_rating in month_means.items())
     
     # 找出各年齡層最佳月份
-    print("\n各年齡層最佳收視月份:")
-    print("-" * 40)
-    
-    monthly_age_df = pd.DataFrame(monthly_age_data)
-    for group in AGE_GROUPS.keys():
-        group_data = monthly_age_df[monthly_age_df['Age_Group'] == group]
-        if len(group_data) > 0:
-            best_month = group_data.loc[group_data['Rating'].idxmax()]
-            worst_month = group_data.loc[group_data['Rating'].idxmin()]
-            print(f"{group:<10} 最佳:{best_month['Month']:2.0f}月({best_month['Rating']:.4f}) " + 
-                  f"最差:{worst_month['Month']:2.0f}月({worst_month['Rating']:.4f})")
-    
-    return monthly_age_df
-
-def create_age_analysis_visualizations():
-    """創建年齡分析視覺化圖表"""
+    lines.append("\n各年齡層最佳收視月份:")
+    lines.append("-" * 40)
+    
+    if not monthly_pivot.empty:
+        best_months = monthly_pivot.idxmax()
+        worst_months = monthly_pivot.idxmin()
+        for group in AGE_GROUPS.keys():
+            best_month = best_months[group]
+            worst_month = worst_months[group]
+            lines.append(f"{group:<10} 最佳:{best_month:2d}月({monthly_pivot.at[best_month, group]:.4f}) " +
+                         f"最差:{worst_month:2d}月({monthly_pivot.at[worst_month, group]:.4f})")
+    
+    print("\n".join(lines), file=out)
+    return monthly_pivot
+
+def run_all_analyses(df, series_counts=None, max_workers=5, use_cache=False, verbose=True):
+    """以執行緒池並行執行五項分析（pandas 的 C 運算會釋放 GIL）
+    
+    各分析的輸出先寫入各自的緩衝區，完成後依固定順序印出，報表內容與循序執行相同。
+    use_cache=True 時（df 須為 load_and_prepare_data() 載入的完整資料），分析結果與
+    報表文字會快取至磁碟，資料檔未變更時直接讀回。
+    verbose=False 時只執行各分析的 _compute_* 計算部分，回傳圖表資料而不產生報表文字
+    （例如單獨產生圖表時）。
+    回傳 (age_pref, time_age, (gender, series_gender), weekday_weekend 結果, monthly)。
+    """
+    if series_counts is None:
+        series_counts = count_series_episodes(df)
+    
+    if not verbose:
+        compute_tasks = [
+            (_compute_age_group_preferences, (df, series_counts)),
+            (_compute_time_slot_demographics, (df,)),
+            (_compute_gender_differences, (df, series_counts)),
+            (_compute_weekday_weekend_performance, (df, series_counts)),
+            (_compute_monthly_age_trends, (df,)),
+        ]
+        
+        def chart_data(func, args):
+            return func(*args)[0]
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            if use_cache:
+                futures = [executor.submit(cached, func.__name__, partial(chart_data, func, args))
+                           for func, args in compute_tasks]
+            else:
+                futures = [executor.submit(chart_data, func, args) for func, args in compute_tasks]
+            return tuple(future.result() for future in futures)
+    
+    tasks = [
+        (analyze_age_group_preferences, (df, series_counts)),
+        (analyze_time_slot_demographics, (df,)),
+        (analyze_gender_differences, (df, series_counts)),
+        (analyze_weekday_weekend_performance, (df, series_counts)),
+        (analyze_monthly_age_trends, (df,)),
+    ]
+    
+    def run_captured(func, args):
+        # 每項分析寫入自己的緩衝區（out 參數），不替換全域的 sys.stdout
+        buffer = io.StringIO()
+        return func(*args, out=buffer), buffer.getvalue()
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if use_cache:
+            futures = [executor.submit(cached, func.__name__, partial(run_captured, func, args))
+                       for func, args in tasks]
+        else:
+            futures = [executor.submit(run_captured, func, args) for func, args in tasks]
+        outputs = [future.result() for future in futures]
+    
+    results = []
+    for result, text in outputs:
+        sys.stdout.write(text)
+        results.append(result)
+    return tuple(results)
+
+def create_age_analysis_visualizations(analysis_results=None, df=None):
+    """創建年齡分析視覺化圖表
+    
+    analysis_results 為 run_all_analyses() 的回傳值；已在 main() 計算過時直接傳入，
+    未提供時才載入資料並執行分析。
+    """
     print("\n" + "="*60)
     print("6. 生成視覺化圖表")
     print("="*60)
@@ -480,12 +681,15 @@ def create_age_analysis_visualizations():
     # 設定字體
     setup_font()
     
-    # 執行各項分析並獲取資料
-    age_pref_data = analyze_age_group_preferences()
-    time_age_data = analyze_time_slot_demographics()
-    gender_data, series_gender_data = analyze_gender_differences()
-    weekday_weekend_data, age_weekday_data, time_weekday_data, series_perf = analyze_weekday_weekend_performance()
-    monthly_data = analyze_monthly_age_trends()
+    if df is None:
+        df = load_and_prepare_data()
+    if analysis_results is None:
+        # 只需要圖表資料，不重複印出各項分析報表
+        analysis_results = run_all_analyses(df, verbose=False)
+    
+    (age_pref_data, time_age_data, (gender_data, series_gender_data),
+     (weekday_weekend_data, age_weekday_data, time_weekday_data, series_perf),
+     monthly_data) = analysis_results
     
     # 創建綜合圖表 (3x3 格局)
     fig, axes = plt.subplots(3, 3, figsize=(18, 15))
@@ -494,8 +698,7 @@ def create_age_analysis_visualizations():
     
     # 1. 主要劇集年齡偏好熱力圖
     if not age_pref_data.empty:
-        pivot_data = age_pref_data.pivot(index='Series', columns='Age_Group', values='Rating')
-        sns.heatmap(pivot_data, annot=True, fmt='.3f', cmap='YlOrRd', 
+        sns.heatmap(age_pref_data, annot=True, fmt='.3f', cmap='YlOrRd', 
                    ax=axes[0, 0], cbar_kws={'label': '收視率'})
         axes[0, 0].set_title('主要劇集年齡偏好分析', fontsize=12, fontproperties='Heiti TC')
         axes[0, 0].set_xlabel('年齡群組', fontsize=10, fontproperties='Heiti TC')
@@ -503,8 +706,7 @@ def create_age_analysis_visualizations():
     
     # 2. 時段年齡分布
     if not time_age_data.empty:
-        pivot_time = time_age_data.pivot(index='Time_Slot', columns='Age_Group', values='Rating')
-        pivot_time.plot(kind='bar', ax=axes[0, 1], width=0.8)
+        time_age_data.plot(kind='bar', ax=axes[0, 1], width=0.8)
         axes[0, 1].set_title('不同時段年齡分布', fontsize=12, fontproperties='Heiti TC')
         axes[0, 1].set_xlabel('時段', fontsize=10, fontproperties='Heiti TC')
         axes[0, 1].set_ylabel('平均收視率', fontsize=10, fontproperties='Heiti TC')
@@ -513,8 +715,7 @@ def create_age_analysis_visualizations():
     
     # 3. 性別差異比較
     if not gender_data.empty:
-        pivot_gender = gender_data.pivot(index='Age_Group', columns='Gender', values='Rating')
-        pivot_gender.plot(kind='bar', ax=axes[0, 2], color=['lightblue', 'lightcoral'])
+        gender_data.plot(kind='bar', ax=axes[0, 2], color=['lightblue', 'lightcoral'])
         axes[0, 2].set_title('各年齡層性別差異', fontsize=12, fontproperties='Heiti TC')
         axes[0, 2].set_xlabel('年齡群組', fontsize=10, fontproperties='Heiti TC')
         axes[0, 2].set_ylabel('平均收視率', fontsize=10, fontproperties='Heiti TC')
@@ -523,8 +724,7 @@ def create_age_analysis_visualizations():
     
     # 4. 週間vs週末劇集表現
     if not weekday_weekend_data.empty:
-        pivot_weekday = weekday_weekend_data.pivot(index='Series', columns='Day_Type', values='Rating')
-        pivot_weekday.plot(kind='bar', ax=axes[1, 0], color=['skyblue', 'orange'])
+        weekday_weekend_data.plot(kind='bar', ax=axes[1, 0], color=['skyblue', 'orange'])
         axes[1, 0].set_title('劇集週間vs週末表現', fontsize=12, fontproperties='Heiti TC')
         axes[1, 0].set_xlabel('劇集', fontsize=10, fontproperties='Heiti TC')
         axes[1, 0].set_ylabel('平均收視率', fontsize=10, fontproperties='Heiti TC')
@@ -555,9 +755,8 @@ def create_age_analysis_visualizations():
     if not monthly_data.empty:
         main_groups = ['4歲以上', '15-44歲', '15-24歲', '55歲以上']
         for group in main_groups:
-            group_data = monthly_data[monthly_data['Age_Group'] == group]
-            if not group_data.empty:
-                axes[2, 0].plot(group_data['Month'], group_data['Rating'], 
+            if group in monthly_data.columns:
+                axes[2, 0].plot(monthly_data.index, monthly_data[group], 
                                marker='o', label=group, linewidth=2)
         axes[2, 0].set_title('月份年齡趨勢', fontsize=12, fontproperties='Heiti TC')
         axes[2, 0].set_xlabel('月份', fontsize=10, fontproperties='Heiti TC')
@@ -568,8 +767,7 @@ def create_age_analysis_visualizations():
     
     # 8. 劇集性別偏好
     if not series_gender_data.empty:
-        pivot_series_gender = series_gender_data.pivot(index='Series', columns='Gender', values='Rating')
-        pivot_series_gender.plot(kind='barh', ax=axes[2, 1], color=['lightblue', 'lightcoral'])
+        series_gender_data.plot(kind='barh', ax=axes[2, 1], color=['lightblue', 'lightcoral'])
         axes[2, 1].set_title('主要劇集性別偏好', fontsize=12, fontproperties='Heiti TC')
         axes[2, 1].set_xlabel('平均收視率', fontsize=10, fontproperties='Heiti TC')
         axes[2, 1].set_ylabel('劇集', fontsize=10, fontproperties='Heiti TC')
@@ -577,43 +775,44 @@ def create_age_analysis_visualizations():
         axes[2, 1].tick_params(labelsize=9)
     
     # 9. 整體年齡分布餅圖
-    df = load_and_prepare_data()
-    age_totals = {}
-    for group_name, columns in AGE_GROUPS.items():
-        if group_name != '4歲以上' and columns[0] in df.columns:
-            age_totals[group_name] = df[columns[0]].sum()
-    
-    if age_totals:
-        axes[2, 2].pie(age_totals.values(), labels=age_totals.keys(), autopct='%1.1f%%', 
+    # 一次對所有年齡層欄位做欄向加總，取代逐欄 sum
+    pie_groups = {group_name: columns[0] for group_name, columns in AGE_GROUPS.items()
+                  if group_name != '4歲以上' and columns[0] in df.columns}
+    
+    if pie_groups:
+        age_totals = df[list(pie_groups.values())].sum()
+        axes[2, 2].pie(age_totals.values, labels=list(pie_groups.keys()), autopct='%1.1f%%', 
                       startangle=90, colors=plt.cm.Set3.colors, 
                       textprops={'fontsize': 9, 'family': 'Heiti TC'})
         axes[2, 2].set_title('整體年齡分布占比', fontsize=12, fontproperties='Heiti TC')
     
     plt.tight_layout()
-    plt.savefig('drama_age_analysis.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    # 18×15 吋的大圖以 150 dpi 輸出已足夠清晰，點陣化緩衝區僅為 300 dpi 的四分之一
+    plt.savefig('drama_age_analysis.png', dpi=150, bbox_inches='tight')
+    # 僅在互動式終端機且使用 GUI 後端時顯示視窗；批次執行（輸出導向檔案、排程）只存檔
+    if sys.stdout.isatty() and matplotlib.get_backend().lower() != 'agg':
+        plt.show()
+    # 釋放大尺寸圖表的繪圖緩衝區，避免重複執行時記憶體持續累積
+    plt.close(fig)
     
     print("✓ 視覺化圖表已保存為 'drama_age_analysis.png'")
 
-def generate_summary_report():
-    """生成分析摘要報告"""
+def generate_summary_report(df=None, series_counts=None, monthly_pivot=None):
+    """生成分析摘要報告（monthly_pivot 為 analyze_monthly_age_trends() 的結果，提供時直接沿用）"""
     print("\n" + "="*60)
     print("6. 分析摘要報告")
     print("="*60)
     
-    df = load_and_prepare_data()
+    if df is None:
+        df = load_and_prepare_data()
     
     # 關鍵發現
     print("\n📊 關鍵發現:")
     print("-" * 30)
     
     # 1. 主要觀眾群
-    age_ratings = {}
-    for group_name, columns in AGE_GROUPS.items():
-        if columns[0] in df.columns:
-            age_ratings[group_name] = df[columns[0]].mean()
-    
-    main_audience = max(age_ratings, key=age_ratings.get)
+    age_ratings = df[AGE_COLS].mean().set_axis(list(AGE_GROUPS))
+    main_audience = age_ratings.idxmax()
     main_rating = age_ratings[main_audience]
     print(f"1. 主要觀眾群: {main_audience} (平均收視率 {main_rating:.4f})")
     
@@ -630,7 +829,10 @@ def generate_summary_report():
     print(f"3. 最佳收視時段: {best_hour}點 (平均收視率 {best_rating:.4f})")
     
     # 4. 季節性趨勢
-    monthly_ratings = df.groupby('Month')['4歲以上'].mean()
+    if monthly_pivot is not None:
+        monthly_ratings = monthly_pivot['4歲以上']
+    else:
+        monthly_ratings = df.groupby('Month')['4歲以上'].mean()
     best_month = monthly_ratings.idxmax()
     worst_month = monthly_ratings.idxmin()
     print(f"4. 最佳收視月份: {best_month}月 ({monthly_ratings[best_month]:.4f})")
@@ -640,19 +842,18 @@ def generate_summary_report():
     print("\n📈 節目策略建議:")
     print("-" * 30)
     
-    series_counts = df['Cleaned_Series_Name'].value_counts()
-    major_series = series_counts[series_counts >= 50].head(5)
+    if series_counts is None:
+        series_counts = count_series_episodes(df)
+    major_series = get_major_series(series_counts, 50, 5)
     
-    for series_name in major_series.index:
-        series_data = df[df['Cleaned_Series_Name'] == series_name]
-        
-        # 找出該劇的主要觀眾群
-        series_age_ratings = {}
-        for group_name, columns in AGE_GROUPS.items():
-            if columns[0] in series_data.columns:
-                series_age_ratings[group_name] = series_data[columns[0]].mean()
-        
-        main_audience_series = max(series_age_ratings, key=series_age_ratings.get)
+    # 一次分組求出各劇的年齡層收視，再以 idxmax 找出各劇的主要觀眾群
+    major_data = df[df['Cleaned_Series_Name'].isin(major_series.index)]
+    series_audience = (major_data.groupby('Cleaned_Series_Name', observed=True)[AGE_COLS].mean()
+                       .loc[major_series.index]
+                       .set_axis(list(AGE_GROUPS), axis=1)
+                       .idxmax(axis=1))
+    
+    for series_name, main_audience_series in series_audience.items():
         print(f"• {series_name[:20]:<20} → 主攻 {main_audience_series}")
     
     print(f"\n✅ 分析完成! 共分析 {len(df):,} 筆收視資料")
@@ -665,21 +866,21 @@ def main():
     print("=" * 60)
     
     try:
-        # 執行完整分析流程
-        age_pref_data = analyze_age_group_preferences()
-        time_age_data = analyze_time_slot_demographics()
-        gender_data, series_gender_data = analyze_gender_differences()
-        weekday_weekend_data, age_weekday_data, time_weekday_data, series_perf = analyze_weekday_weekend_performance()
-        monthly_data = analyze_monthly_age_trends()
+        # 載入資料並計算各劇集集數一次，供所有分析共用
+        df = load_and_prepare_data()
+        series_counts = count_series_episodes(df)
+        
+        # 執行完整分析流程（五項分析互不相依，並行執行）
+        analysis_results = run_all_analyses(df, series_counts, use_cache=True)
         
-        # 生成視覺化圖表
-        create_age_analysis_visualizations()
+        # 生成視覺化圖表（直接使用上面的分析結果，不重新計算）
+        create_age_analysis_visualizations(analysis_results, df)
         
         # 生成摘要報告
-        generate_summary_report()
+        generate_summary_report(df, series_counts, monthly_pivot=analysis_results[-1])
         
     except FileNotFoundError:
-        print("❌ 錯誤: 找不到 'ACNelson_normalized_with_age.csv' 檔案")
+        print(f"❌ 錯誤: 找不到 '{DATA_FILE}' 檔案")
         print("   請先執行 'process_acnelson_with_age.py' 生成年齡分層資料")
     except Exception as e:
         print(f"❌ 分析過程中發生錯誤: {e}")
@@ -9,6 +9,19 @@ import re
 plt.rcParams['font.sans-serif'] = ['Heiti TC']
 plt.rcParams['axes.unicode_minus'] = False
 
+# 節目名稱中的集數標記，例如「延禧攻略#12」
+EPISODE_PATTERN = re.compile(r'#(\d+)')
+
+def extract_episode_numbers(programs):
+    """以向量化的 str.extract 一次取出所有節目的集數（無集數者為 <NA>）"""
+    return programs.astype(str).str.extract(EPISODE_PATTERN, expand=False).astype('Int64')
+
+def fast_corr(x, y):
+    """Pearson 相關係數的封閉式計算，避免 np.corrcoef 每次配置 2x2 矩陣"""
+    xm = x - x.mean()
+    ym = y - y.mean()
+    return (xm @ ym) / np.sqrt((xm @ xm) * (ym @ ym))
+
 def analyze_drama_ratings():
     """分析整部劇的收視率變化和主要收視時段"""
     
@@ -16,39 +29,41 @@ def analyze_drama_ratings():
     df = pd.read_csv('integrated_program_ratings_cleaned.csv')
     df = df[df['Rating'].notna()]  # 只取有收視率的資料
     df['Date'] = pd.to_datetime(df['Date'])
-    df['Hour'] = pd.to_datetime(df['Time'], format='%H:%M:%S').dt.hour
-    
+    df['Hour'] = df['Time'].str.slice(0, 2).astype('int8')  # 'HH:MM:SS' 取前兩碼即為小時
+    # 劇集名稱轉為 category（依首次出現順序），value_counts / 比對 / 分組改以整數代碼進行
+    series_names = df['Cleaned_Series_Name']
+    df['Cleaned_Series_Name'] = pd.Categorical(series_names,
+                                               categories=series_names.dropna().unique())
+
     print("=== 整部劇收視率變化分析 (使用清理後資料) ===\n")
     
     # 2. 找出主要劇集（集數較多的）
     series_counts = df['Cleaned_Series_Name'].value_counts()
     major_series = series_counts[series_counts >= 20].head(10)  # 至少20集的前10部劇
     
+    # 一次 groupby 取得各劇平均與最高收視率，依 major_series 的順序取出
+    series_stats = df.groupby('Cleaned_Series_Name', observed=True)['Rating'].agg(['mean', 'max']).loc[major_series.index]
+    
     print("1. 主要劇集統計 (集數>=20)")
     print("=" * 50)
-    for series, count in major_series.items():
-        avg_rating = df[df['Cleaned_Series_Name'] == series]['Rating'].mean()
-        max_rating = df[df['Cleaned_Series_Name'] == series]['Rating'].max()
+    for series, count, avg_rating, max_rating in zip(major_series.index, major_series.values,
+                                                      series_stats['mean'], series_stats['max']):
         print(f"{series:<20} 集數:{count:3d} 平均:{avg_rating:.4f} 最高:{max_rating:.4f}")
     
     # 3. 分析每部主要劇集的收視率變化
     print("\n2. 主要劇集收視率趨勢分析")
     print("=" * 50)
     
-    for series_name in major_series.head(5).index:  # 分析前5部劇
-        series_data = df[df['Cleaned_Series_Name'] == series_name].copy()
-        
-        # 提取集數
-        def extract_episode_number(program_name):
-            match = re.search(r'#(\d+)', str(program_name))
-            return int(match.group(1)) if match else None
-        
-        series_data['Episode'] = series_data['Program'].apply(extract_episode_number)
-        series_data = series_data[series_data['Episode'].notna()]
-        
-        if len(series_data) > 0:
-            # 按集數分組計算平均收視率
-            episode_ratings = series_data.groupby('Episode')['Rating'].mean().sort_index()
+    # 前5部劇一次提取集數，並依 (劇集, 集數) 分組計算平均收視率，趨勢與增長分析共用
+    trend_series = major_series.head(5).index
+    trend_data = df.loc[df['Cleaned_Series_Name'].isin(trend_series), ['Cleaned_Series_Name', 'Program', 'Rating']]
+    trend_data = trend_data.assign(Episode=extract_episode_numbers(trend_data['Program'])).dropna(subset=['Episode'])
+    episode_rows = trend_data.groupby('Cleaned_Series_Name', observed=True).size()
+    all_episode_ratings = trend_data.groupby(['Cleaned_Series_Name', 'Episode'], observed=True)['Rating'].mean()
+    
+    for series_name in trend_series:  # 分析前5部劇
+        if episode_rows.get(series_name, 0) > 0:
+            episode_ratings = all_episode_ratings.loc[series_name]
             
             print(f"\n{series_name}:")
             print(f"  總集數: {len(episode_ratings)}")
@@ -65,7 +80,8 @@ def analyze_drama_ratings():
             
             # 計算趨勢
             if len(episode_ratings) >= 5:
-                correlation = np.corrcoef(episode_ratings.index, episode_ratings.values)[0, 1]
+                correlation = fast_corr(episode_ratings.index.to_numpy(dtype='float64'),
+                                        episode_ratings.to_numpy(dtype='float64'))
                 trend = "上升" if correlation > 0.1 else "下降" if correlation < -0.1 else "平穩"
                 print(f"  整體趨勢: {trend} (相關係數: {correlation:.3f})")
     
@@ -86,11 +102,14 @@ def analyze_drama_ratings():
     print("\n4. 黃金時段詳細分析 (18-22點)")
     print("=" * 50)
     
+    # 直接沿用上面的逐小時統計，不再對黃金時段子集重新 groupby
+    prime_hourly = hourly_stats.loc[hourly_stats.index.isin(range(18, 23)), ['mean', 'count']].sort_index()
     prime_time = df[df['Hour'].between(18, 22)]
-    prime_hourly = prime_time.groupby('Hour')['Rating'].agg(['mean', 'count']).round(4)
+    # 穩定排序後每小時取前3名，與逐小時 nlargest(3) 結果相同
+    prime_top = prime_time.sort_values('Rating', ascending=False, kind='stable').groupby('Hour').head(3)
     
     for hour, row in prime_hourly.iterrows():
-        top_programs = prime_time[prime_time['Hour'] == hour].nlargest(3, 'Rating')
+        top_programs = prime_top[prime_top['Hour'] == hour]
         print(f"\n{hour}點 (平均收視率: {row['mean']:.4f}, 節目數: {row['count']:.0f})")
         print("  收視率前3名:")
         for idx, (_, program) in enumerate(top_programs.iterrows(), 1):
@@ -128,13 +147,17 @@ def analyze_drama_ratings():
     
     bins = [0, 0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 1.0]
     labels = ['<0.05', '0.05-0.1', '0.1-0.15', '0.15-0.2', '0.2-0.3', '0.3-0.5', '≥0.5']
-    df['Rating_Range'] = pd.cut(df['Rating'], bins=bins, labels=labels, include_lowest=True)
-    
-    rating_dist = df['Rating_Range'].value_counts().sort_index()
+    # 以 searchsorted + bincount 直接計數，不另建 Rating_Range 欄位
+    # 區間右閉、最低區間含下界，與 pd.cut(..., include_lowest=True) 相同；超出範圍者不計
+    ratings = df['Rating'].to_numpy()
+    bin_idx = np.searchsorted(bins, ratings, side='left') - 1
+    bin_idx[ratings == bins[0]] = 0
+    in_range = (bin_idx >= 0) & (bin_idx < len(labels))
+    rating_dist = np.bincount(bin_idx[in_range], minlength=len(labels))
     
     print("收視率區間    節目數量    百分比")
     print("-" * 35)
-    for range_label, count in rating_dist.items():
+    for range_label, count in zip(labels, rating_dist):
         percentage = count / len(df) * 100
         print(f"{range_label:<12}  {count:6d}    {percentage:5.1f}%")
     
@@ -147,10 +170,10 @@ def analyze_drama_ratings():
     if len(high_rating_programs) > 0:
         print(f"✓ 收視率突破0.5的節目共 {len(high_rating_programs)} 筆")
         top_series = high_rating_programs['Cleaned_Series_Name'].value_counts().head(3)
+        top_series_avg = high_rating_programs.groupby('Cleaned_Series_Name', observed=True)['Rating'].mean()
         print("  表現最好的劇集:")
         for series, count in top_series.items():
-            avg_rating = high_rating_programs[high_rating_programs['Cleaned_Series_Name'] == series]['Rating'].mean()
-            print(f"    {series}: {count}集突破0.5 (平均{avg_rating:.4f})")
+            print(f"    {series}: {count}集突破0.5 (平均{top_series_avg[series]:.4f})")
     
     # 最佳播出時段
     best_hour = hourly_stats.index[0]
@@ -158,21 +181,18 @@ def analyze_drama_ratings():
     print(f"\n✓ 最佳播出時段: {best_hour}點 (平均收視率 {best_rating:.4f})")
     
     # 收視率增長最快的劇集
-    growth_analysis = {}
-    for series_name in major_series.head(5).index:
-        series_data = df[df['Cleaned_Series_Name'] == series_name].copy()
-        series_data['Episode'] = series_data['Program'].apply(lambda x: re.search(r'#(\d+)', str(x)).group(1) if re.search(r'#(\d+)', str(x)) else None)
-        series_data = series_data[series_data['Episode'].notna()]
-        
-        if len(series_data) >= 10:  # 至少10集
-            episode_ratings = series_data.groupby('Episode')['Rating'].mean().sort_index()
-            first_half = episode_ratings.iloc[:len(episode_ratings)//2].mean()
-            second_half = episode_ratings.iloc[len(episode_ratings)//2:].mean()
-            growth = (second_half - first_half) / first_half * 100
-            growth_analysis[series_name] = growth
-    
-    if growth_analysis:
-        best_growth = max(growth_analysis, key=growth_analysis.get)
+    # 以各劇集數排序後的位置區分前後半，一次分組算出前後半平均
+    series_level = all_episode_ratings.index.get_level_values('Cleaned_Series_Name')
+    episode_pos = all_episode_ratings.groupby(level=0, observed=True).cumcount()
+    episode_total = all_episode_ratings.groupby(level=0, observed=True).transform('size')
+    is_second_half = (episode_pos >= episode_total // 2).to_numpy()
+    half_means = (all_episode_ratings.groupby([series_level, is_second_half], observed=True).mean()
+                  .unstack().reindex(columns=[False, True]))
+    growth_analysis = ((half_means[True] - half_means[False]) / half_means[False] * 100).reindex(trend_series)
+    growth_analysis = growth_analysis[episode_rows.reindex(trend_series, fill_value=0).to_numpy() >= 10].dropna()  # 至少10集
+    
+    if not growth_analysis.empty:
+        best_growth = growth_analysis.idxmax()
         print(f"\n✓ 收視率增長最佳劇集: {best_growth} (增長 {growth_analysis[best_growth]:+.1f}%)")
     
     return df
@@ -198,7 +218,7 @@ def create_visualizations():
     df = pd.read_csv('integrated_program_ratings_cleaned.csv')
     df = df[df['Rating'].notna()]
     df['Date'] = pd.to_datetime(df['Date'])
-    df['Hour'] = pd.to_datetime(df['Time'], format='%H:%M:%S').dt.hour
+    df['Hour'] = df['Time'].str.slice(0, 2).astype('int8')  # 'HH:MM:SS' 取前兩碼即為小時
     
     # 創建圖表
     fig, axes = plt.subplots(2, 2, figsize=(15, 12))
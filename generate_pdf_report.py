@@ -15,29 +15,55 @@ generate_pdf_report.py
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 import os
+import shutil
 import subprocess
+import tempfile
 from datetime import datetime
+from string import Template
 import sys
 
 # 導入我們的分析模組
 sys.path.append('.')
+import drama_age_analysis
 from drama_age_analysis import (
+    cached,
     load_and_prepare_data, 
     analyze_age_group_preferences,
     analyze_time_slot_demographics,
     analyze_gender_differences,
     analyze_monthly_age_trends,
     setup_font,
-    AGE_GROUPS
+    AGE_GROUPS,
+    AGE_COLS,
+    GENDER_COLS,
+    DATA_FILE
 )
 
-def collect_analysis_results():
-    """收集所有分析結果"""
+# 報告結果快取的依據：資料檔或分析模組變更即重新計算。本程式不列入，
+# 只修改報告模板/排版時可沿用快取；若修改了 _compute_analysis_results，請以 --force 重新計算
+REPORT_SOURCE_FILES = (DATA_FILE, drama_age_analysis.__file__)
+
+def collect_analysis_results(use_cache=True):
+    """收集所有分析結果
+    
+    use_cache=True 時結果以 pickle 快取（鍵為 REPORT_SOURCE_FILES 的修改時間與大小），
+    來源未變更時直接載入，不必重新讀檔與彙總。
+    """
     print("🔍 收集分析結果...")
     
+    if use_cache:
+        results = cached('report_results', _compute_analysis_results, source_files=REPORT_SOURCE_FILES)
+    else:
+        results = _compute_analysis_results()
+    
+    # 報告日期不隨快取保存，每次產生報告時重新填入
+    results['data_summary']['analysis_date'] = datetime.now().strftime('%Y-%m-%d')
+    return results
+
+def _compute_analysis_results():
+    """載入資料並計算報告所需的各項分析結果"""
     # 載入資料
     df = load_and_prepare_data()
     
@@ -45,76 +71,84 @@ def collect_analysis_results():
         'data_summary': {
             'total_records': len(df),
             'date_range': f"{df['Date'].min().strftime('%Y-%m-%d')} 至 {df['Date'].max().strftime('%Y-%m-%d')}",
-            'total_series': df['Cleaned_Series_Name'].nunique(),
-            'analysis_date': datetime.now().strftime('%Y-%m-%d')
+            'total_series': df['Cleaned_Series_Name'].nunique()
         }
     }
     
+    # 欄位是否存在只檢查一次：年齡群組 -> 資料欄位，後續各段落直接沿用
+    col_set = set(df.columns)
+    age_group_cols = {group_name: columns[0] for group_name, columns in AGE_GROUPS.items()
+                      if columns[0] in col_set}
+    
+    rating_cols = [col for col in AGE_COLS + GENDER_COLS if col in col_set]
+    
+    # 時段直接沿用載入時已切好的 Time_Period 類別欄位（TIME_SLOTS 的五個時段），
+    # 只將類別名稱改為報告用的「凌晨時段」等字樣，不需重新依小時分類
+    time_slot = df['Time_Period'].cat.rename_categories(lambda name: f"{name}時段")
+    
+    # 整體、各時段、各月份平均只掃描資料一次：先以 (月份, 時段) 分組取得各格的
+    # 總和與有效筆數，再依月份或時段合併小表後相除
+    cell_groups = df.groupby([df['Month'], time_slot], observed=True)
+    cell_sizes = cell_groups.size()
+    cell_sums = cell_groups[rating_cols].sum()
+    cell_counts = cell_groups[rating_cols].count()
+    
+    overall_means = cell_sums.sum() / cell_counts.sum()
+    
     # 1. 年齡層整體收視率
-    age_ratings = {}
-    for group_name, columns in AGE_GROUPS.items():
-        if columns[0] in df.columns:
-            age_ratings[group_name] = df[columns[0]].mean()
+    age_ratings = {group_name: overall_means[col] for group_name, col in age_group_cols.items()}
     
     results['age_ratings'] = dict(sorted(age_ratings.items(), key=lambda x: x[1], reverse=True))
     
     # 2. 主要劇集分析（>=50集）
-    series_counts = df['Cleaned_Series_Name'].value_counts()
-    major_series = series_counts[series_counts >= 50].head(10)
+    # 只需前10部，以 nlargest 做部分選取，不必排序全部劇集的集數
+    # （同集數時依首次出現順序，與 value_counts().head() 相同）
+    series_counts = df.groupby('Cleaned_Series_Name', observed=True, sort=False).size()
+    major_series = series_counts[series_counts >= 50].nlargest(10)
+    
+    # 主要劇集的各年齡層平均以一次 groupby 算出（欄名換成年齡群組名稱），不再逐劇篩選
+    series_means = (df[df['Cleaned_Series_Name'].isin(major_series.index)]
+                    .groupby('Cleaned_Series_Name', observed=True)[list(age_group_cols.values())].mean()
+                    .set_axis(list(age_group_cols), axis=1)
+                    .loc[major_series.index])
+    # 找出主要觀眾群：對平均值矩陣做一次逐列 argmax，再以索引取出最高收視率
+    # （同分時取年齡群組順序中較前者，與 max(dict) 相同）
+    series_matrix = series_means.to_numpy()
+    best_idx = np.nanargmax(series_matrix, axis=1)
+    main_audiences = series_means.columns[best_idx]
+    main_ratings = series_matrix[np.arange(len(best_idx)), best_idx]
     
     series_analysis = []
-    for series_name in major_series.index:
-        series_data = df[df['Cleaned_Series_Name'] == series_name]
-        series_info = {
+    for series_name, episodes, ratings, best_group, best_rating in zip(
+            major_series.index, major_series.values, series_means.to_dict(orient='records'),
+            main_audiences, main_ratings):
+        series_analysis.append({
             'name': series_name,
-            'episodes': len(series_data),
-            'ratings': {}
-        }
-        
-        for group_name, columns in AGE_GROUPS.items():
-            if columns[0] in series_data.columns:
-                series_info['ratings'][group_name] = series_data[columns[0]].mean()
-        
-        # 找出主要觀眾群
-        best_group = max(series_info['ratings'], key=series_info['ratings'].get)
-        series_info['main_audience'] = best_group
-        series_info['main_rating'] = series_info['ratings'][best_group]
-        
-        series_analysis.append(series_info)
+            'episodes': int(episodes),
+            'ratings': ratings,
+            'main_audience': best_group,
+            'main_rating': best_rating
+        })
     
     results['series_analysis'] = series_analysis
     
-    # 3. 時段分析
-    time_slots = {
-        '凌晨時段': (0, 5),
-        '早晨時段': (6, 11),
-        '午間時段': (12, 17),
-        '黃金時段': (18, 22),
-        '深夜時段': (23, 23)
-    }
+    # 3. 時段分析（沒有資料的時段也列出，筆數為 0）
+    slot_counts = cell_sizes.groupby(level=1, observed=False).sum()
+    slot_means = (cell_sums.groupby(level=1, observed=False).sum()
+                  / cell_counts.groupby(level=1, observed=False).sum())
     
     time_analysis = {}
-    for slot_name, (start, end) in time_slots.items():
-        if start <= end:
-            slot_data = df[(df['Hour'] >= start) & (df['Hour'] <= end)]
-        else:  # 跨午夜的情況
-            slot_data = df[(df['Hour'] >= start) | (df['Hour'] <= end)]
-        
-        slot_ratings = {}
-        for group_name, columns in AGE_GROUPS.items():
-            if columns[0] in slot_data.columns:
-                slot_ratings[group_name] = slot_data[columns[0]].mean()
-        
+    for slot_name in time_slot.cat.categories:
         time_analysis[slot_name] = {
-            'count': len(slot_data),
-            'ratings': slot_ratings
+            'count': int(slot_counts[slot_name]),
+            'ratings': {group_name: slot_means.at[slot_name, col] for group_name, col in age_group_cols.items()}
         }
     
     results['time_analysis'] = time_analysis
     
     # 4. 性別差異分析
-    male_avg = df['4歲以上男性'].mean()
-    female_avg = df['4歲以上女性'].mean()
+    male_avg = overall_means['4歲以上男性']
+    female_avg = overall_means['4歲以上女性']
     
     gender_analysis = {
         'overall': {
@@ -136,9 +170,9 @@ def collect_analysis_results():
     
     age_gender_details = {}
     for age_group, (male_col, female_col) in age_gender_columns.items():
-        if male_col in df.columns and female_col in df.columns:
-            male_rate = df[male_col].mean()
-            female_rate = df[female_col].mean()
+        if male_col in col_set and female_col in col_set:
+            male_rate = overall_means[male_col]
+            female_rate = overall_means[female_col]
             age_gender_details[age_group] = {
                 'male': male_rate,
                 'female': female_rate,
@@ -150,43 +184,41 @@ def collect_analysis_results():
     results['gender_analysis'] = gender_analysis
     
     # 5. 月份趨勢
+    month_counts = cell_sizes.groupby(level=0).sum()
+    month_means = cell_sums.groupby(level=0).sum() / cell_counts.groupby(level=0).sum()
+    
     monthly_data = []
-    for month in range(1, 13):
-        month_data = df[df['Month'] == month]
-        if len(month_data) > 0:
-            month_info = {
-                'month': month,
-                'count': len(month_data),
-                'ratings': {}
-            }
-            for group_name, columns in AGE_GROUPS.items():
-                if columns[0] in month_data.columns:
-                    month_info['ratings'][group_name] = month_data[columns[0]].mean()
-            monthly_data.append(month_info)
+    for month in month_means.index:
+        monthly_data.append({
+            'month': int(month),
+            'count': int(month_counts[month]),
+            'ratings': {group_name: month_means.at[month, col] for group_name, col in age_group_cols.items()}
+        })
     
     results['monthly_analysis'] = monthly_data
     
-    # 6. 最佳/最差月份
+    # 6. 最佳/最差月份：直接由同一張月份平均表以 idxmax / idxmin 取得
     best_worst = {}
-    for group_name in AGE_GROUPS.keys():
-        group_monthly = [(m['month'], m['ratings'].get(group_name, 0)) for m in monthly_data if group_name in m['ratings']]
-        if group_monthly:
-            best_month = max(group_monthly, key=lambda x: x[1])
-            worst_month = min(group_monthly, key=lambda x: x[1])
+    if not month_means.empty:
+        best_months = month_means.idxmax()
+        worst_months = month_means.idxmin()
+        for group_name, col in age_group_cols.items():
+            best_month = best_months[col]
+            worst_month = worst_months[col]
             best_worst[group_name] = {
-                'best': {'month': best_month[0], 'rating': best_month[1]},
-                'worst': {'month': worst_month[0], 'rating': worst_month[1]}
+                'best': {'month': int(best_month), 'rating': month_means.at[best_month, col]},
+                'worst': {'month': int(worst_month), 'rating': month_means.at[worst_month, col]}
             }
     
     results['best_worst_months'] = best_worst
     
     return results
 
-def generate_latex_report(results):
-    """生成LaTeX格式的報告"""
-    print("📝 生成LaTeX報告...")
-    
-    latex_content = r"""
+# 報告中時段與月份表格的欄位順序
+REPORT_TABLE_GROUPS = ['總體', '核心觀眾', '年輕族群', '青壯年', '中年', '熟齡', '銀髮族']
+
+# 報告版面：單一 string.Template，以 ${名稱} 代入預先格式化的數值與表格列
+LATEX_TEMPLATE = Template(r"""
 \documentclass[12pt,a4paper]{article}
 \usepackage[UTF8]{ctex}
 \usepackage{geometry}
@@ -208,7 +240,7 @@ def generate_latex_report(results):
 % 標題設定
 \title{\textbf{\Large 愛爾達綜合台劇集年齡分層收視分析報告}}
 \author{資料分析團隊}
-\date{""" + results['data_summary']['analysis_date'] + r"""}
+\date{${analysis_date}}
 
 \begin{document}
 
@@ -220,17 +252,17 @@ def generate_latex_report(results):
 \section{執行摘要}
 
 本報告基於愛爾達綜合台2024年全年ACNelson收視資料，進行深度年齡分層收視分析。
-分析涵蓋""" + f"{results['data_summary']['total_records']:,}" + r"""筆收視紀錄，
-時間範圍為""" + results['data_summary']['date_range'] + r"""，
-包含""" + str(results['data_summary']['total_series']) + r"""部劇集。
+分析涵蓋${total_records}筆收視紀錄，
+時間範圍為${date_range}，
+包含${total_series}部劇集。
 
 \subsection{主要發現}
 \begin{itemize}
-    \item 主要觀眾群：""" + list(results['age_ratings'].keys())[0] + r"""（平均收視率 """ + f"{list(results['age_ratings'].values())[0]:.4f}" + r"""）
-    \item 性別偏向：""" + results['gender_analysis']['overall']['preferred'] + r"""觀眾較多（差異 """ + f"{results['gender_analysis']['overall']['difference']:.4f}" + r"""）
+    \item 主要觀眾群：${top_group}（平均收視率 ${top_group_rating}）
+    \item 性別偏向：${gender_preferred}觀眾較多（差異 ${gender_difference}）
     \item 最佳收視時段：黃金時段（18-22點）
-    \item 收視表現最佳月份：""" + str(results['best_worst_months']['總體']['best']['month']) + r"""月
-    \item 收視表現最差月份：""" + str(results['best_worst_months']['總體']['worst']['month']) + r"""月
+    \item 收視表現最佳月份：${best_month}月
+    \item 收視表現最差月份：${worst_month}月
 \end{itemize}
 
 \section{資料概況}
@@ -242,10 +274,10 @@ def generate_latex_report(results):
 \toprule
 項目 & 數值 \\
 \midrule
-總收視紀錄數 & """ + f"{results['data_summary']['total_records']:,}" + r""" 筆 \\
-分析時間範圍 & """ + results['data_summary']['date_range'] + r""" \\
-涵蓋劇集數量 & """ + str(results['data_summary']['total_series']) + r""" 部 \\
-分析生成日期 & """ + results['data_summary']['analysis_date'] + r""" \\
+總收視紀錄數 & ${total_records} 筆 \\
+分析時間範圍 & ${date_range} \\
+涵蓋劇集數量 & ${total_series} 部 \\
+分析生成日期 & ${analysis_date} \\
 \bottomrule
 \end{tabular}
 \end{table}
@@ -263,13 +295,7 @@ def generate_latex_report(results):
 \toprule
 年齡群組 & 平均收視率 \\
 \midrule
-"""
-
-    # 加入年齡層收視率表格
-    for group, rating in results['age_ratings'].items():
-        latex_content += f"{group} & {rating:.4f} \\\\\n"
-
-    latex_content += r"""
+${age_rows}
 \bottomrule
 \end{tabular}
 \end{table}
@@ -291,13 +317,7 @@ def generate_latex_report(results):
 \endhead
 \bottomrule
 \endfoot
-"""
-
-    # 加入劇集分析表格
-    for series in results['series_analysis']:
-        latex_content += f"{series['name']} & {series['episodes']:,} & {series['main_audience']} & {series['main_rating']:.4f} \\\\\n"
-
-    latex_content += r"""
+${series_rows}
 \end{longtable}
 
 \section{時段收視分析}
@@ -311,17 +331,7 @@ def generate_latex_report(results):
 \toprule
 時段 & 總體 & 核心觀眾 & 年輕族群 & 青壯年 & 中年 & 熟齡 & 銀髮族 \\
 \midrule
-"""
-
-    # 加入時段分析表格
-    for time_slot, data in results['time_analysis'].items():
-        latex_content += f"{time_slot}"
-        for group in ['總體', '核心觀眾', '年輕族群', '青壯年', '中年', '熟齡', '銀髮族']:
-            rating = data['ratings'].get(group, 0)
-            latex_content += f" & {rating:.4f}"
-        latex_content += " \\\\\n"
-
-    latex_content += r"""
+${slot_rows}
 \bottomrule
 \end{tabular}
 \end{table}
@@ -337,10 +347,10 @@ def generate_latex_report(results):
 \toprule
 性別 & 平均收視率 \\
 \midrule
-男性觀眾 & """ + f"{results['gender_analysis']['overall']['male']:.4f}" + r""" \\
-女性觀眾 & """ + f"{results['gender_analysis']['overall']['female']:.4f}" + r""" \\
-差異 & """ + f"{results['gender_analysis']['overall']['difference']:.4f}" + r""" \\
-偏向 & """ + results['gender_analysis']['overall']['preferred'] + r"""觀眾 \\
+男性觀眾 & ${male_rating} \\
+女性觀眾 & ${female_rating} \\
+差異 & ${gender_difference} \\
+偏向 & ${gender_preferred}觀眾 \\
 \bottomrule
 \end{tabular}
 \end{table}
@@ -354,13 +364,7 @@ def generate_latex_report(results):
 \toprule
 年齡層 & 男性 & 女性 & 差異 & 偏向 \\
 \midrule
-"""
-
-    # 加入年齡層性別差異表格
-    for age_group, data in results['gender_analysis']['by_age'].items():
-        latex_content += f"{age_group} & {data['male']:.4f} & {data['female']:.4f} & {data['difference']:.4f} & {data['preferred']} \\\\\n"
-
-    latex_content += r"""
+${gender_age_rows}
 \bottomrule
 \end{tabular}
 \end{table}
@@ -374,17 +378,7 @@ def generate_latex_report(results):
 \toprule
 月份 & 總體 & 核心觀眾 & 年輕族群 & 青壯年 & 中年 & 熟齡 & 銀髮族 \\
 \midrule
-"""
-
-    # 加入月份分析表格
-    for month_data in results['monthly_analysis']:
-        latex_content += f"{month_data['month']}月"
-        for group in ['總體', '核心觀眾', '年輕族群', '青壯年', '中年', '熟齡', '銀髮族']:
-            rating = month_data['ratings'].get(group, 0)
-            latex_content += f" & {rating:.4f}"
-        latex_content += " \\\\\n"
-
-    latex_content += r"""
+${month_rows}
 \bottomrule
 \end{tabular}
 \end{table}
@@ -398,19 +392,7 @@ def generate_latex_report(results):
 \toprule
 年齡群組 & 最佳月份 & 最佳收視率 & 最差月份 & 最差收視率 \\
 \midrule
-"""
-
-    # 加入最佳/最差月份表格
-    for group, data in results['best_worst_months'].items():
-        if group != '總體':  # 總體放在最後
-            latex_content += f"{group} & {data['best']['month']}月 & {data['best']['rating']:.4f} & {data['worst']['month']}月 & {data['worst']['rating']:.4f} \\\\\n"
-    
-    # 總體放在最後
-    if '總體' in results['best_worst_months']:
-        data = results['best_worst_months']['總體']
-        latex_content += f"總體 & {data['best']['month']}月 & {data['best']['rating']:.4f} & {data['worst']['month']}月 & {data['worst']['rating']:.4f} \\\\\n"
-
-    latex_content += r"""
+${best_worst_rows}
 \bottomrule
 \end{tabular}
 \end{table}
@@ -440,15 +422,15 @@ def generate_latex_report(results):
 
 \subsection{觀眾定位策略}
 \begin{itemize}
-    \item 重點服務""" + list(results['age_ratings'].keys())[0] + r"""和""" + list(results['age_ratings'].keys())[1] + r"""觀眾
+    \item 重點服務${top_group}和${second_group}觀眾
     \item 針對女性觀眾偏好進行內容規劃
     \item 強化黃金時段節目品質
 \end{itemize}
 
 \subsection{節目編排建議}
 \begin{itemize}
-    \item """ + str(results['best_worst_months']['總體']['best']['month']) + r"""月安排重點劇集首播
-    \item """ + str(results['best_worst_months']['總體']['worst']['month']) + r"""月進行節目調整或重播安排
+    \item ${best_month}月安排重點劇集首播
+    \item ${worst_month}月進行節目調整或重播安排
     \item 古裝劇和家庭劇較受銀髮族喜愛
 \end{itemize}
 
@@ -462,7 +444,7 @@ def generate_latex_report(results):
 \section{結論}
 
 本分析報告基於2024年全年收視資料，深度剖析了愛爾達綜合台的年齡分層收視特徵。
-主要發現""" + list(results['age_ratings'].keys())[0] + r"""為最重要的觀眾群，女性觀眾整體收視偏好較高，
+主要發現${top_group}為最重要的觀眾群，女性觀眾整體收視偏好較高，
 黃金時段為各年齡層的最佳收視時間。
 
 建議電視台在未來的節目規劃中，重點關注銀髮族和熟齡觀眾的需求，
@@ -470,9 +452,68 @@ def generate_latex_report(results):
 以提升整體收視表現。
 
 \end{document}
-"""
+""")
+
+def _format_rating_rows(labels, ratings_list):
+    """將多列 {群組: 收視率} 依 REPORT_TABLE_GROUPS 排成矩陣，以 np.char.mod 一次格式化成表格列"""
+    table = np.array([[ratings.get(group, 0) for group in REPORT_TABLE_GROUPS] for ratings in ratings_list],
+                     dtype=float).reshape(-1, len(REPORT_TABLE_GROUPS))
+    cells = np.char.mod('%.4f', table)
+    return "".join(f"{label} & {' & '.join(row)} \\\\\n" for label, row in zip(labels, cells))
 
-    return latex_content
+def generate_latex_report(results):
+    """生成LaTeX格式的報告"""
+    print("📝 生成LaTeX報告...")
+    
+    summary = results['data_summary']
+    age_groups = list(results['age_ratings'])
+    overall_gender = results['gender_analysis']['overall']
+    overall_months = results['best_worst_months']['總體']
+    
+    # 各表格的資料列以 join 一次組成
+    age_rows = "".join(f"{group} & {rating:.4f} \\\\\n" for group, rating in results['age_ratings'].items())
+    
+    series_rows = "".join(
+        f"{series['name']} & {series['episodes']:,} & {series['main_audience']} & {series['main_rating']:.4f} \\\\\n"
+        for series in results['series_analysis'])
+    
+    slot_rows = _format_rating_rows(results['time_analysis'].keys(),
+                                    [data['ratings'] for data in results['time_analysis'].values()])
+    
+    gender_age_rows = "".join(
+        f"{age_group} & {data['male']:.4f} & {data['female']:.4f} & {data['difference']:.4f} & {data['preferred']} \\\\\n"
+        for age_group, data in results['gender_analysis']['by_age'].items())
+    
+    month_rows = _format_rating_rows([f"{month_data['month']}月" for month_data in results['monthly_analysis']],
+                                     [month_data['ratings'] for month_data in results['monthly_analysis']])
+    
+    # 總體放在最後（穩定排序，其餘年齡群組維持原順序）
+    best_worst = results['best_worst_months']
+    best_worst_rows = "".join(
+        f"{group} & {best_worst[group]['best']['month']}月 & {best_worst[group]['best']['rating']:.4f} & "
+        f"{best_worst[group]['worst']['month']}月 & {best_worst[group]['worst']['rating']:.4f} \\\\\n"
+        for group in sorted(best_worst, key=lambda group: group == '總體'))
+    
+    return LATEX_TEMPLATE.substitute(
+        analysis_date=summary['analysis_date'],
+        total_records=f"{summary['total_records']:,}",
+        date_range=summary['date_range'],
+        total_series=summary['total_series'],
+        top_group=age_groups[0],
+        top_group_rating=f"{results['age_ratings'][age_groups[0]]:.4f}",
+        second_group=age_groups[1],
+        gender_preferred=overall_gender['preferred'],
+        gender_difference=f"{overall_gender['difference']:.4f}",
+        male_rating=f"{overall_gender['male']:.4f}",
+        female_rating=f"{overall_gender['female']:.4f}",
+        best_month=overall_months['best']['month'],
+        worst_month=overall_months['worst']['month'],
+        age_rows=age_rows,
+        series_rows=series_rows,
+        slot_rows=slot_rows,
+        gender_age_rows=gender_age_rows,
+        month_rows=month_rows,
+        best_worst_rows=best_worst_rows)
 
 def compile_pdf(latex_content, output_name="drama_age_analysis_report"):
     """編譯LaTeX為PDF"""
@@ -483,21 +524,31 @@ def compile_pdf(latex_content, output_name="drama_age_analysis_report"):
     with open(tex_file, 'w', encoding='utf-8') as f:
         f.write(latex_content)
     
+    # 報告使用 ctex，只能以 XeLaTeX 編譯；先確認編譯器存在，避免必定失敗的行程啟動
+    if shutil.which('xelatex') is None:
+        print("❌ 找不到XeLaTeX編譯器")
+        print("請安裝TeX Live或MacTeX")
+        return False
+    
     try:
-        # 編譯LaTeX (需要運行兩次來生成目錄)
-        print("  第一次編譯...")
-        subprocess.run(['xelatex', '-interaction=nonstopmode', tex_file], 
-                      capture_output=True, check=True)
-        
-        print("  第二次編譯...")
-        subprocess.run(['xelatex', '-interaction=nonstopmode', tex_file], 
-                      capture_output=True, check=True)
-        
-        # 清理輔助文件
-        for ext in ['.aux', '.log', '.toc', '.out']:
-            aux_file = f"{output_name}{ext}"
-            if os.path.exists(aux_file):
-                os.remove(aux_file)
+        # 輔助檔 (.aux/.toc/.log/.xdv) 全部輸出到暫存目錄，結束時整個目錄一併移除，
+        # 不再逐一刪除，也不會與同目錄下其他編譯互相覆寫
+        with tempfile.TemporaryDirectory(prefix=f"{output_name}_") as build_dir:
+            # 編譯LaTeX (需要運行兩次來生成目錄)
+            # 第一次只為產生 .aux/.toc，以 -no-pdf 僅輸出 XDV，省去轉成 PDF 的步驟
+            # （XeTeX 不支援 pdfTeX 的 -draftmode，-no-pdf 為其對應選項）；
+            # batchmode 不輸出終端訊息，-halt-on-error 讓錯誤在第一次編譯即中止
+            print("  第一次編譯...")
+            subprocess.run(['xelatex', '-interaction=batchmode', '-halt-on-error', '-no-pdf',
+                            f'-output-directory={build_dir}', tex_file], 
+                          capture_output=True, check=True)
+            
+            print("  第二次編譯...")
+            subprocess.run(['xelatex', '-interaction=nonstopmode',
+                            f'-output-directory={build_dir}', tex_file], 
+                          capture_output=True, check=True)
+            
+            shutil.move(os.path.join(build_dir, f"{output_name}.pdf"), f"{output_name}.pdf")
         
         # 保留.tex文件以備檢查
         print(f"✅ PDF報告生成成功：{output_name}.pdf")
@@ -514,8 +565,11 @@ def compile_pdf(latex_content, output_name="drama_age_analysis_report"):
     
     return True
 
-def main():
-    """主函式"""
+def main(force=False):
+    """主函式
+    
+    force=True（命令列 --force）時忽略分析結果快取，重新計算所有數據。
+    """
     print("🎬 愛爾達綜合台劇集年齡分層收視分析PDF報告生成器")
     print("=" * 60)
     
@@ -526,8 +580,8 @@ def main():
         from drama_age_analysis import create_age_analysis_visualizations
         create_age_analysis_visualizations()
     
-    # 收集分析結果
-    results = collect_analysis_results()
+    # 收集分析結果（來源未變更時直接使用快取，只需重新排版報告）
+    results = collect_analysis_results(use_cache=not force)
     
     # 生成LaTeX報告
     latex_content = generate_latex_report(results)
@@ -546,4 +600,4 @@ def main():
         print("您可以使用其他LaTeX編輯器手動編譯")
 
 if __name__ == "__main__":
-    main()
+    main(force='--force' in sys.argv[1:])
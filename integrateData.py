@@ -1,35 +1,54 @@
 import pandas as pd
+import numpy as np
 import datetime
-from datetime import time
+
+# python-calamine 為選用套件：有安裝時以 Rust 實作的 calamine 引擎讀取 Excel，解析速度遠快於 openpyxl
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+def excel_row_to_dates(date_row):
+    """向量化處理整行 Excel 日期格式，並將非2024年的日期調整為2024年
+
+    支援 datetime、日期字串與 Excel 序列日數混合的欄位，無法解析者回傳 NaT。
+    """
+    date_row = date_row.astype(object)
+    is_datetime = date_row.map(lambda v: isinstance(v, datetime.datetime)).astype(bool)
+    is_text = date_row.map(lambda v: isinstance(v, str)).astype(bool)
+    is_number = date_row.map(lambda v: isinstance(v, (int, float))).astype(bool)
+
+    dates = pd.to_datetime(date_row.where(is_datetime), errors='coerce')
+
+    texts = date_row.where(is_text).str.strip()
+    texts = texts.where(~texts.isin(['日期', '']))
+    dates = dates.fillna(pd.to_datetime(texts, format='mixed', errors='coerce'))
+
+    # Excel 序列日數（有效範圍至 9999-12-31 = 2958465）
+    serials = np.trunc(pd.to_numeric(date_row.where(is_number), errors='coerce'))
+    serials = serials.where(serials.between(0, 2958465))
+    serial_dates = pd.to_datetime(serials, unit='D', origin='1899-12-30', errors='coerce')
+    dates = dates.fillna(serial_dates.astype(dates.dtype))
+
+    # 將所有非2024年和2025年的日期調整為2024年（保持月日不變）
+    other_year = dates.notna() & ~dates.dt.year.isin([2024, 2025])
+    if other_year.any():
+        rebased = pd.to_datetime(pd.DataFrame({
+            'year': 2024, 'month': dates.dt.month, 'day': dates.dt.day
+        })[other_year], errors='coerce')
+        dates = dates.mask(other_year, rebased)
+
+    return dates.dt.date
 
 def excel_to_date(excel_date):
-    """處理 Excel 日期格式，並將非2024年的日期調整為2024年"""
-    try:
-        date_result = None
-        
-        if isinstance(excel_date, datetime.datetime):
-            date_result = excel_date.date()
-        elif isinstance(excel_date, str):
-            if excel_date == '日期' or excel_date.strip() == '':
-                return None
-            date_result = pd.to_datetime(excel_date).date()
-        elif isinstance(excel_date, (int, float)):
-            converted = pd.to_datetime('1899-12-30') + pd.to_timedelta(int(excel_date), 'D')
-            date_result = converted.date()
-        else:
-            return None
-            
-        # 將所有非2024年和2025年的日期調整為2024年（保持月日不變）
-        if date_result and date_result.year not in [2024, 2025]:
-            date_result = date_result.replace(year=2024)
-            
-        return date_result
-    except:
-        return None
+    """轉換單一 Excel 日期格式（excel_row_to_dates 的單值版本），無法解析者回傳 None"""
+    date = excel_row_to_dates(pd.Series([excel_date], dtype=object)).iloc[0]
+    return None if pd.isna(date) else date
 
 def extract_ratings_data(ratings_file_path):
     """提取收視率資料"""
-    xls = pd.ExcelFile(ratings_file_path)
+    xls = pd.ExcelFile(ratings_file_path, engine='calamine' if CALAMINE_AVAILABLE else None)
     all_ratings = []
     
     for sheet_name in xls.sheet_names:
@@ -39,70 +58,44 @@ def extract_ratings_data(ratings_file_path):
         print(f"處理收視率工作表: {sheet_name}")
         df = pd.read_excel(xls, sheet_name=sheet_name, header=None)
         
-        # 提取日期行（第1行）
+        # 提取日期行（第1行）並一次轉換整行日期
         date_row = df.iloc[1, 1:]  # 跳過第一列
+        dates = excel_row_to_dates(date_row)
+        valid_cols = dates.notna().to_numpy()
         
         # 提取時段列（從第5行開始）
         time_slots = df.iloc[5:, 0]  # 從付費用戶數後開始的時段
         
-        # 遍歷每一列（代表一天）
-        for col_idx in range(1, df.shape[1]):
-            date_value = date_row.iloc[col_idx-1] if col_idx-1 < len(date_row) else None
-            
-            if pd.isna(date_value):
-                continue
-                
-            date = excel_to_date(date_value)
-            if date is None:
-                continue
-            
-            # 提取該列的收視率數據（從第5行開始）
-            ratings_col = df.iloc[5:, col_idx]
-            
-            # 將時段和收視率配對
-            for time_slot, rating in zip(time_slots, ratings_col):
-                if pd.notna(time_slot) and pd.notna(rating) and str(time_slot).startswith(('0', '1', '2')):
-                    # 解析時段格式 "00:00~00:15" -> 開始時間 "00:00"
-                    try:
-                        start_time_str = str(time_slot).split('~')[0]
-                        start_time = datetime.datetime.strptime(start_time_str, '%H:%M').time()
-                        
-                        all_ratings.append({
-                            'Date': date,
-                            'Time_Slot': time_slot,
-                            'Start_Time': start_time,
-                            'Rating': float(rating),
-                            'Sheet': sheet_name
-                        })
-                    except:
-                        continue
+        # 解析時段格式 "00:00~00:15" -> 開始時間 "00:00"，只保留 0/1/2 開頭且可解析的時段
+        slot_text = time_slots.astype(str)
+        start_times = pd.to_datetime(slot_text.str.split('~').str[0], format='%H:%M', errors='coerce')
+        valid_rows = (time_slots.notna() & slot_text.str.match(r'[012]') & start_times.notna()).to_numpy()
+        
+        # 日期 × 時段區塊攤平成長表（逐日展開，等同 melt）
+        block = df.iloc[5:, 1:].to_numpy()[valid_rows][:, valid_cols]
+        n_slots, n_days = block.shape
+        sheet_ratings = pd.DataFrame({
+            'Date': np.repeat(dates.to_numpy()[valid_cols], n_slots),
+            'Time_Slot': np.tile(time_slots.to_numpy()[valid_rows], n_days),
+            'Start_Time': np.tile(start_times.dt.time.to_numpy()[valid_rows], n_days),
+            'Rating': pd.to_numeric(block.ravel(order='F'), errors='coerce'),
+            'Sheet': sheet_name
+        })
+        all_ratings.append(sheet_ratings[sheet_ratings['Rating'].notna()])
     
-    return pd.DataFrame(all_ratings)
+    if not all_ratings:
+        return pd.DataFrame()
+    return pd.concat(all_ratings, ignore_index=True)
+
+def program_times_to_slots(program_times):
+    """將節目時間（整欄）轉換為對應的15分鐘時段開始時間，無法解析者為 NaT"""
+    times = pd.to_datetime(program_times.astype(str), format='%H:%M:%S', errors='coerce')
+    return times.dt.floor('15min').dt.time
 
 def convert_program_time_to_slot(program_time):
-    """將節目時間轉換為對應的15分鐘時段"""
-    if pd.isna(program_time) or program_time is None:
-        return None
-        
-    try:
-        if isinstance(program_time, str):
-            program_time = datetime.datetime.strptime(program_time, '%H:%M:%S').time()
-        elif isinstance(program_time, datetime.time):
-            pass
-        else:
-            return None
-            
-        # 將時間轉換為15分鐘時段的開始時間
-        hour = program_time.hour
-        minute = program_time.minute
-        
-        # 計算15分鐘時段
-        slot_minute = (minute // 15) * 15
-        slot_time = time(hour, slot_minute)
-        
-        return slot_time
-    except:
-        return None
+    """將單一節目時間轉換為15分鐘時段開始時間（program_times_to_slots 的單值版本），無法解析者回傳 None"""
+    slot = program_times_to_slots(pd.Series([program_time], dtype=object)).iloc[0]
+    return None if pd.isna(slot) else slot
 
 def integrate_program_and_ratings(program_file, ratings_file):
     """整合節目表和收視率資料"""
@@ -125,16 +118,17 @@ def integrate_program_and_ratings(program_file, ratings_file):
     
     # 為節目資料添加時段對應
     print("計算節目對應的收視時段...")
-    program_df['Time_Slot_Start'] = program_df['Time'].apply(convert_program_time_to_slot)
+    program_df['Time_Slot_Start'] = program_times_to_slots(program_df['Time'])
     
-    # 合併資料
+    # 合併資料：收視率以 (日期, 時段開始) 為索引，節目表依索引左連接（保留節目表順序，
+    # 不用 merge_asof，避免缺漏時段誤取前一時段的收視率）
     print("合併節目表和收視率資料...")
-    merged_df = program_df.merge(
-        ratings_df,
-        left_on=['Date', 'Time_Slot_Start'],
-        right_on=['Date', 'Start_Time'],
-        how='left'
-    )
+    ratings_indexed = ratings_df.set_index(['Date', 'Start_Time'])
+    merged_df = program_df.join(
+        ratings_indexed,
+        on=['Date', 'Time_Slot_Start'],
+        lsuffix='_x', rsuffix='_y'
+    ).reset_index(drop=True)
     
     # 清理欄位
     merged_df = merged_df.drop(['Time_Slot_Start', 'Start_Time', 'Sheet_y'], axis=1, errors='ignore')
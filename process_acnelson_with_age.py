@@ -21,22 +21,43 @@ Usage:
 
 This script uses pandas and openpyxl. Install via:
   pip install -r requirements.txt
+Optionally `pip install python-calamine` for faster Excel parsing.
 
 """
 import re
 from pathlib import Path
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import os
 import sys
 import warnings
 
+import numpy as np
 import pandas as pd
 
+# python-calamine is optional: when installed, pandas reads the workbooks with
+# the Rust-based calamine engine, which parses XLSX much faster than openpyxl
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+EXCEL_ENGINE = 'calamine' if CALAMINE_AVAILABLE else 'openpyxl'
+
 ROOT = Path(__file__).resolve().parent
 AC_DIR = ROOT / "ACNelsonViewingRate"
 OUT_PATH = ROOT / "ACNelson_normalized_with_age.csv"
 
 WEEKDAY_CN = {0: "一", 1: "二", 2: "三", 3: "四", 4: "五", 5: "六", 6: "日"}
 
+# Program-name markers stripped from Cleaned_Series_Name, fused into one pattern:
+# episode markers like #12 / #12(完) / ##12 (through end of string), any
+# parenthetical such as (完), (第 X 集) or (普) in half/full width, and 首播.
+SERIES_MARKERS_RE = re.compile(r"[#＃]{1,2}\s*\d+.*$|（.*?）|\(.*?\)|首播")
+# Trailing separators must be trimmed in a second pass: they only become
+# trailing after the markers that followed them have been removed.
+TRAILING_SEPARATORS_RE = re.compile(r"[\-–—:：\s]+$")
+
 # Age group columns to preserve (based on the file structure we saw)
 AGE_COLUMNS = [
     '4歲以上', '15-44歲', '4歲以上最高', '4歲以上女性', '4歲以上男性',
@@ -48,66 +69,64 @@ AGE_COLUMNS = [
 ]
 
 
+def cleaned_series_names(progs):
+    """Vectorized series-name cleaning over a Series of program names."""
+    s = progs.fillna("").astype(str).str.strip()
+    # remove episode markers, parenthetical markers and 首播 in one pass
+    s = s.str.replace(SERIES_MARKERS_RE, "", regex=True)
+    # trim trailing separators (left behind once the markers are removed)
+    s = s.str.replace(TRAILING_SEPARATORS_RE, "", regex=True)
+    return s.str.strip()
+
+
 def cleaned_series_name(prog):
-    if pd.isna(prog):
-        return ""
-    s = str(prog).strip()
-    # remove episode markers like #12 or #12(完) or ##12
-    s = re.sub(r"[#＃]{1,2}\s*\d+.*$", "", s)
-    # remove parenthetical completion markers like (完)
-    s = re.sub(r"（.*?）|\(.*?\)", "", s)
-    # remove (第 X 集) patterns
-    s = re.sub(r"\(第.*?集\)", "", s)
-    # remove 首播 and (普) markers
-    s = re.sub(r"首播|（普）|\(普\)", "", s)
-    # trim trailing separators
-    s = re.sub(r"[\-–—:：\s]+$", "", s)
-    return s.strip()
+    """Scalar wrapper of cleaned_series_names for one program name."""
+    return cleaned_series_names(pd.Series([prog], dtype=object)).iloc[0]
+
+
+def weekday_cn_from_dates(dates):
+    """Map a Series of parsed dates (NaT allowed) to Chinese weekday labels."""
+    return dates.dt.weekday.map(WEEKDAY_CN).fillna("")
 
 
 def weekday_cn_from_date(d):
-    if pd.isna(d):
+    """Scalar wrapper of weekday_cn_from_dates for one raw date string or datetime."""
+    if not isinstance(d, (str, datetime)):
         return ""
-    if isinstance(d, str):
-        # try parse common formats
-        for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%Y%m%d"):
-            try:
-                dt = datetime.strptime(d.strip(), fmt)
-                return WEEKDAY_CN[dt.weekday()]
-            except Exception:
-                continue
-        try:
-            dt = pd.to_datetime(d)
-            return WEEKDAY_CN[dt.weekday()]
-        except Exception:
-            return ""
-    if isinstance(d, (pd.Timestamp, datetime)):
-        return WEEKDAY_CN[d.weekday()]
-    return ""
+    date = pd.to_datetime(d.strip() if isinstance(d, str) else d, errors='coerce')
+    return weekday_cn_from_dates(pd.Series([date])).iloc[0]
 
 
-def parse_time_from_slot(time_slot):
-    """Extract start time from time slot like '00:00~01:00'"""
-    if pd.isna(time_slot):
-        return ""
-    slot_str = str(time_slot).strip()
+def parse_times_from_slots(time_slots):
+    """Extract start times from a Series of time slots like '00:00~01:00'"""
+    slot_str = time_slots.fillna("").astype(str).str.strip()
     # Extract the start time (before ~)
-    if '~' in slot_str:
-        start_time = slot_str.split('~')[0].strip()
-        # Ensure it's in HH:MM:SS format
-        if ':' in start_time and len(start_time.split(':')) == 2:
-            start_time += ':00'
-        return start_time
-    return slot_str
+    start_time = slot_str.str.split('~').str[0].str.strip()
+    # Ensure it's in HH:MM:SS format
+    needs_seconds = start_time.str.count(':') == 1
+    start_time = start_time.where(~needs_seconds, start_time + ':00')
+    times = slot_str.where(~slot_str.str.contains('~', regex=False), start_time)
+    return times.where(time_slots.notna(), "")
+
+
+def parse_time_from_slot(time_slot):
+    """Scalar wrapper of parse_times_from_slots for one time slot."""
+    return parse_times_from_slots(pd.Series([time_slot], dtype=object)).iloc[0]
 
 
 def normalize_file(path: Path):
-    out_rows = []
+    """Normalize one workbook; returns (rows DataFrame, warning messages).
+
+    Runs in a worker process, so messages are returned for the parent to print
+    under this file's header instead of being printed here.
+    """
+    out_frames = []
+    messages = []
     try:
-        xls = pd.read_excel(path, sheet_name=None, engine='openpyxl')
+        xls = pd.read_excel(path, sheet_name=None, engine=EXCEL_ENGINE)
     except Exception as e:
-        print(f"Failed to open {path.name}: {e}")
-        return out_rows
+        messages.append(f"Failed to open {path.name}: {e}")
+        return pd.DataFrame(), messages
 
     for sheet_name, df in xls.items():
         if df.empty:
@@ -127,53 +146,46 @@ def normalize_file(path: Path):
         main_rating_col = '4歲以上'  # Use this as the main rating
 
         if date_col not in df.columns or prog_col not in df.columns:
-            print(f"  Warning: Required columns not found in {sheet_name}")
+            messages.append(f"  Warning: Required columns not found in {sheet_name}")
             continue
 
-        for idx, row in df.iterrows():
-            date_val = row[date_col] if date_col in row.index else None
-            time_slot_val = row[time_col] if time_col in row.index else None
-            prog_val = row[prog_col] if prog_col in row.index else None
-
-            # Skip rows with missing essential data
-            if pd.isna(date_val) or pd.isna(prog_val):
-                continue
-
-            # Parse time from time slot
-            time_val = parse_time_from_slot(time_slot_val)
-            
-            # Main rating (4歲以上)
-            rating = row[main_rating_col] if main_rating_col in row.index else None
-
-            # Clean program name
-            cleaned = cleaned_series_name(prog_val)
-
-            # Get weekday
-            weekday_cn = weekday_cn_from_date(date_val)
-
-            # Build base row
-            row_data = {
-                'Date': pd.to_datetime(date_val).date() if not pd.isna(date_val) else '',
-                'Weekday': weekday_cn,
-                'Time': time_val,
-                'Program': prog_val if prog_val is not None else '',
-                'Program_Sheet': f"{path.name}:{sheet_name}",
-                'Time_Slot': time_slot_val if time_slot_val is not None else '',
-                'Rating': float(rating) if pd.notna(rating) else 0.0,
-                'Cleaned_Series_Name': cleaned,
-            }
-            
-            # Add all age group columns
-            for age_col in AGE_COLUMNS:
-                if age_col in row.index:
-                    age_val = row[age_col]
-                    row_data[age_col] = float(age_val) if pd.notna(age_val) else 0.0
-                else:
-                    row_data[age_col] = 0.0
-
-            out_rows.append(row_data)
+        # Skip rows with missing essential data
+        df = df[df[date_col].notna() & df[prog_col].notna()]
+        dates = pd.to_datetime(df[date_col], errors='coerce')
+        # Inference locks onto the first row's format; re-parse the rest one by one
+        unparsed = dates.isna()
+        if unparsed.any():
+            dates[unparsed] = pd.to_datetime(df.loc[unparsed, date_col], format='mixed', errors='coerce')
+        df, dates = df[dates.notna()], dates[dates.notna()]
+        if df.empty:
+            continue
 
-    return out_rows
+        time_slots = df[time_col] if time_col in df.columns else pd.Series('', index=df.index, dtype=object)
+        ratings = df[main_rating_col] if main_rating_col in df.columns else pd.Series(0.0, index=df.index)
+
+        sub = pd.DataFrame({
+            'Date': dates.dt.date,
+            'Weekday': weekday_cn_from_dates(dates),
+            'Time': parse_times_from_slots(time_slots),
+            'Program': df[prog_col],
+            'Program_Sheet': f"{path.name}:{sheet_name}",
+            'Time_Slot': time_slots,
+            'Rating': ratings.astype(float).fillna(0.0),
+            'Cleaned_Series_Name': cleaned_series_names(df[prog_col]),
+        })
+
+        # Add all age group columns: coerce to float32 in one pass, zero-fill
+        # blanks/non-numeric cells and any age column missing from this sheet
+        present_age_cols = [c for c in AGE_COLUMNS if c in df.columns]
+        missing_age_cols = [c for c in AGE_COLUMNS if c not in df.columns]
+        age_data = (df[present_age_cols].apply(pd.to_numeric, errors='coerce')
+                    .fillna(0.0).astype('float32'))
+        age_data = age_data.assign(**{c: np.float32(0.0) for c in missing_age_cols})
+        out_frames.append(pd.concat([sub, age_data[AGE_COLUMNS]], axis=1))
+
+    if not out_frames:
+        return pd.DataFrame(), messages
+    return pd.concat(out_frames, ignore_index=True), messages
 
 
 def main():
@@ -182,18 +194,23 @@ def main():
         print("No ACNelson files found in:", AC_DIR)
         return
 
-    all_rows = []
-    for f in files:
-        print(f"Processing {f.name}...")
-        rows = normalize_file(f)
-        print(f"  -> extracted {len(rows)} rows")
-        all_rows.extend(rows)
-
-    if not all_rows:
+    # Each workbook is independent and openpyxl parsing is CPU-bound,
+    # so files are normalized in parallel worker processes.
+    frames = []
+    max_workers = min(len(files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for f, (rows, messages) in zip(files, executor.map(normalize_file, files)):
+            print(f"Processing {f.name}...")
+            for message in messages:
+                print(message)
+            print(f"  -> extracted {len(rows)} rows")
+            frames.append(rows)
+
+    if not any(len(rows) for rows in frames):
         print("No rows extracted.")
         return
 
-    out_df = pd.DataFrame(all_rows)
+    out_df = pd.concat(frames, ignore_index=True)
     
     # Remove any rows with empty dates or programs
     out_df = out_df[out_df['Date'] != '']
@@ -0,0 +1,129 @@
+"""
+test_drama_age_analysis.py
+
+drama_age_analysis 的回歸測試：分析結果快取（命中時不重算，輸入檔修改時間或大小改變時失效）
+與向量化的劇名截斷（以舊版逐筆實作為基準）
+"""
+
+import glob
+import os
+import tempfile
+
+import drama_age_analysis
+
+
+class CountingFn:
+    """記錄被呼叫次數的計算函式，每次回傳不同結果以分辨是否重算"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {'result': self.calls}
+
+
+def run_with_cache_dir(test_body):
+    """在暫存目錄中執行測試，並暫時將 CACHE_DIR 指向其中的快取資料夾"""
+    original_cache_dir = drama_age_analysis.CACHE_DIR
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        drama_age_analysis.CACHE_DIR = os.path.join(tmp_dir, 'cache')
+        source_file = os.path.join(tmp_dir, 'data.csv')
+        with open(source_file, 'w', encoding='utf-8') as f:
+            f.write('Date,Rating\n2024-01-01,0.5\n')
+        try:
+            test_body(source_file)
+        finally:
+            drama_age_analysis.CACHE_DIR = original_cache_dir
+
+
+def cache_files(name):
+    return glob.glob(os.path.join(drama_age_analysis.CACHE_DIR, f"{name}_*.pkl"))
+
+
+def test_cached_hit_skips_recompute():
+    """輸入檔未變時第二次直接讀取快取，不再呼叫計算函式"""
+    def body(source_file):
+        fn = CountingFn()
+        first = drama_age_analysis.cached('demo', fn, source_files=(source_file,))
+        second = drama_age_analysis.cached('demo', fn, source_files=(source_file,))
+
+        assert fn.calls == 1
+        assert first == second == {'result': 1}
+        assert len(cache_files('demo')) == 1
+
+    run_with_cache_dir(body)
+
+
+def test_cached_invalidated_by_mtime():
+    """僅修改時間改變（內容與大小相同）也會重新計算，並移除舊的快取檔"""
+    def body(source_file):
+        fn = CountingFn()
+        drama_age_analysis.cached('demo', fn, source_files=(source_file,))
+        old_files = cache_files('demo')
+
+        stat = os.stat(source_file)
+        os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+        result = drama_age_analysis.cached('demo', fn, source_files=(source_file,))
+
+        assert fn.calls == 2
+        assert result == {'result': 2}
+        new_files = cache_files('demo')
+        assert len(new_files) == 1 and new_files != old_files
+
+    run_with_cache_dir(body)
+
+
+def test_cached_invalidated_by_size():
+    """內容大小改變時重新計算（即使修改時間被還原）"""
+    def body(source_file):
+        fn = CountingFn()
+        drama_age_analysis.cached('demo', fn, source_files=(source_file,))
+
+        stat = os.stat(source_file)
+        with open(source_file, 'a', encoding='utf-8') as f:
+            f.write('2024-01-02,0.7\n')
+        os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        result = drama_age_analysis.cached('demo', fn, source_files=(source_file,))
+
+        assert fn.calls == 2
+        assert result == {'result': 2}
+        assert len(cache_files('demo')) == 1
+
+    run_with_cache_dir(body)
+
+
+def test_cached_names_are_independent():
+    """不同名稱的快取互不覆蓋，清除舊檔時只刪除同名稱的檔案"""
+    def body(source_file):
+        drama_age_analysis.cached('first', CountingFn(), source_files=(source_file,))
+        drama_age_analysis.cached('second', CountingFn(), source_files=(source_file,))
+
+        assert len(cache_files('first')) == 1
+        assert len(cache_files('second')) == 1
+
+    run_with_cache_dir(body)
+
+
+def legacy_shorten_names(names, max_len, suffix='...'):
+    """舊版逐筆截斷（向量化前），作為比對基準"""
+    return [name[:max_len] + suffix if len(name) > max_len else name for name in names]
+
+
+def test_shorten_names_matches_legacy():
+    """超過長度者截斷加後綴，剛好等於長度或較短者不變（含中文名稱）"""
+    names = ['神鵰俠侶', '對你不止是喜歡', '聖鬥士星矢OMEGA第二季完整版', 'A' * 10, 'B' * 11,
+             'Short', '', '你也有今天你也有今天你也有今天你也有今天']
+
+    for max_len, suffix in [(10, '...'), (12, '...'), (15, '..'), (18, '..'), (0, '...')]:
+        result = drama_age_analysis.shorten_names(names, max_len, suffix=suffix)
+        assert list(result) == legacy_shorten_names(names, max_len, suffix), (max_len, suffix)
+
+
+if __name__ == "__main__":
+    test_cached_hit_skips_recompute()
+    test_cached_invalidated_by_mtime()
+    test_cached_invalidated_by_size()
+    test_cached_names_are_independent()
+    test_shorten_names_matches_legacy()
+    print("✅ drama_age_analysis 回歸測試通過")
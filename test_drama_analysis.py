@@ -0,0 +1,39 @@
+"""
+test_drama_analysis.py
+
+drama_analysis 向量化集數擷取的回歸測試，以舊版逐筆 re.search 實作為基準比對結果
+"""
+
+import re
+
+import pandas as pd
+
+import drama_analysis
+
+
+def legacy_extract_episode_number(program_name):
+    """舊版逐筆實作（向量化前），作為比對基準"""
+    match = re.search(r'#(\d+)', str(program_name))
+    return int(match.group(1)) if match else None
+
+
+def test_extract_episode_numbers_matches_legacy():
+    """取第一個 '#' 後的數字為集數；無集數、缺值與全形 '＃' 皆為空值"""
+    values = ['神鵰俠侶#7', '神鵰俠侶 #12(完)', '星漢燦爛##12', 'A#3#4', '對你不止是喜歡＃15',
+              '你也有今天 (第 13 集)(普)', '#', '# 5', 'B#007', '', None, float('nan'), 123]
+    programs = pd.Series(values, dtype=object)
+
+    result = drama_analysis.extract_episode_numbers(programs)
+
+    expected = [legacy_extract_episode_number(v) for v in values]
+    assert len(result) == len(expected)
+    for got, want in zip(result, expected):
+        if want is None:
+            assert pd.isna(got), (got, want)
+        else:
+            assert got == want, (got, want)
+
+
+if __name__ == "__main__":
+    test_extract_episode_numbers_matches_legacy()
+    print("✅ drama_analysis 回歸測試通過")
@@ -0,0 +1,208 @@
+"""
+test_integrate_data.py
+
+integrateData 向量化輔助函式的回歸測試，以舊版逐筆實作為基準比對結果
+"""
+
+import datetime
+import os
+import tempfile
+
+import pandas as pd
+
+import integrateData
+
+
+def legacy_excel_to_date(excel_date):
+    """舊版逐筆實作（向量化前），作為比對基準"""
+    try:
+        date_result = None
+
+        if isinstance(excel_date, datetime.datetime):
+            date_result = excel_date.date()
+        elif isinstance(excel_date, str):
+            if excel_date == '日期' or excel_date.strip() == '':
+                return None
+            date_result = pd.to_datetime(excel_date).date()
+        elif isinstance(excel_date, (int, float)):
+            converted = pd.to_datetime('1899-12-30') + pd.to_timedelta(int(excel_date), 'D')
+            date_result = converted.date()
+        else:
+            return None
+
+        if date_result and date_result.year not in [2024, 2025]:
+            date_result = date_result.replace(year=2024)
+
+        return date_result
+    except:
+        return None
+
+
+def assert_same_dates(actual, expected):
+    """NaT 與 None 視為相同，其餘逐一比對（日期或時間）"""
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        if want is None:
+            assert pd.isna(got), (got, want)
+        else:
+            assert got == want, (got, want)
+
+
+def test_excel_to_date_matches_legacy():
+    """混合 datetime、字串、Excel 序列日數與無效值的日期列，結果與舊版一致"""
+    values = [
+        datetime.datetime(2024, 1, 1),
+        datetime.datetime(2025, 3, 15, 8, 30),
+        datetime.datetime(2023, 2, 28),       # 非 2024/2025 年 → 調整為 2024
+        pd.Timestamp('2022-12-31'),
+        '2024/02/29',
+        ' 2024-03-01 ',
+        '2019-07-04',
+        '日期',
+        '',
+        '   ',
+        'garbage',
+        45292,                                 # 2024-01-01
+        45658.75,                              # 2025-01-01（捨去小數）
+        43831,                                 # 2020-01-01 → 2024-01-01
+        1,                                     # 1899-12-31 → 2024-12-31
+        float('nan'),
+        None,
+        datetime.date(2024, 1, 1),             # 非 datetime 的 date 物件不處理
+    ]
+    date_row = pd.Series(values, dtype=object, index=range(1, len(values) + 1))
+
+    result = integrateData.excel_row_to_dates(date_row)
+
+    expected = [legacy_excel_to_date(v) for v in values]
+    assert list(result.index) == list(date_row.index)
+    assert_same_dates(list(result), expected)
+    # 單值版本保留舊介面：逐筆呼叫，無法解析者回傳 None
+    assert [integrateData.excel_to_date(v) for v in values] == expected
+
+
+def test_excel_to_date_numeric_row():
+    """整列皆為數值（float dtype）時也能處理"""
+    date_row = pd.Series([45292.0, 45293.0, float('nan')])
+
+    result = integrateData.excel_row_to_dates(date_row)
+
+    assert_same_dates(list(result), [datetime.date(2024, 1, 1), datetime.date(2024, 1, 2), None])
+
+
+def legacy_extract_ratings_data(ratings_file_path):
+    """舊版逐格實作（向量化前），作為比對基準"""
+    xls = pd.ExcelFile(ratings_file_path)
+    all_ratings = []
+
+    for sheet_name in xls.sheet_names:
+        if sheet_name == '月平均收視率':
+            continue
+
+        df = pd.read_excel(xls, sheet_name=sheet_name, header=None)
+        date_row = df.iloc[1, 1:]
+        time_slots = df.iloc[5:, 0]
+
+        for col_idx in range(1, df.shape[1]):
+            date_value = date_row.iloc[col_idx-1] if col_idx-1 < len(date_row) else None
+            if pd.isna(date_value):
+                continue
+            date = legacy_excel_to_date(date_value)
+            if date is None:
+                continue
+
+            ratings_col = df.iloc[5:, col_idx]
+            for time_slot, rating in zip(time_slots, ratings_col):
+                if pd.notna(time_slot) and pd.notna(rating) and str(time_slot).startswith(('0', '1', '2')):
+                    try:
+                        start_time_str = str(time_slot).split('~')[0]
+                        start_time = datetime.datetime.strptime(start_time_str, '%H:%M').time()
+                        all_ratings.append({
+                            'Date': date,
+                            'Time_Slot': time_slot,
+                            'Start_Time': start_time,
+                            'Rating': float(rating),
+                            'Sheet': sheet_name
+                        })
+                    except:
+                        continue
+
+    return pd.DataFrame(all_ratings)
+
+
+def write_ratings_workbook(path):
+    """建立小型收視率活頁簿：第1列為日期、第5列起為時段，另含摘要表與無效時段/日期"""
+    def sheet_rows(dates, slots):
+        rows = [['頻道'] + ['綜合台'] * len(dates),
+                ['日期'] + dates,
+                ['星期'] + ['一'] * len(dates),
+                ['付費用戶數'] + [100] * len(dates),
+                ['用戶數'] + [200] * len(dates)]
+        for i, slot in enumerate(slots):
+            rows.append([slot] + [round(0.01 * (i + 1) * (j + 1), 4) if (i + j) % 4 else None
+                                  for j in range(len(dates))])
+        return rows
+
+    slots = ['00:00~00:14', '00:15~00:29', '12:30~12:44', '23:45~23:59',
+             '合計', None, '24:00~24:14', '2x:00~bad']
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        pd.DataFrame([[1, 2]]).to_excel(writer, sheet_name='月平均收視率', header=False, index=False)
+        pd.DataFrame(sheet_rows(
+            [datetime.datetime(2024, 1, 1), datetime.datetime(2023, 1, 2), None, '2024/01/04', '日期'],
+            slots)).to_excel(writer, sheet_name='1月', header=False, index=False)
+        pd.DataFrame(sheet_rows([45323, 45324.0, 'garbage'], slots)).to_excel(
+            writer, sheet_name='2月', header=False, index=False)
+
+
+def test_extract_ratings_data_matches_legacy():
+    """日期 × 時段區塊攤平後的長表（含欄位順序、型別與列順序）與舊版一致"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'ratings.xlsx')
+        write_ratings_workbook(path)
+
+        expected = legacy_extract_ratings_data(path)
+        result = integrateData.extract_ratings_data(path)
+
+    assert len(result) > 0
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def legacy_convert_program_time_to_slot(program_time):
+    """舊版逐筆實作（向量化前），作為比對基準"""
+    if pd.isna(program_time) or program_time is None:
+        return None
+
+    try:
+        if isinstance(program_time, str):
+            program_time = datetime.datetime.strptime(program_time, '%H:%M:%S').time()
+        elif isinstance(program_time, datetime.time):
+            pass
+        else:
+            return None
+
+        return datetime.time(program_time.hour, (program_time.minute // 15) * 15)
+    except:
+        return None
+
+
+def test_convert_program_time_to_slot_matches_legacy():
+    """字串與 time 物件皆對應到所屬15分鐘時段開始時間，無法解析者為空值"""
+    values = ['00:00:00', '00:14:59', '00:15:00', '07:05:00', '7:05:00', '12:44:30',
+              '23:59:59', datetime.time(6, 44), datetime.time(18, 45, 10),
+              'bad', '25:00:00', None, float('nan')]
+    program_times = pd.Series(values, dtype=object)
+
+    result = integrateData.program_times_to_slots(program_times)
+
+    expected = [legacy_convert_program_time_to_slot(v) for v in values]
+    assert_same_dates(list(result), expected)
+    # 單值版本保留舊介面：逐筆呼叫，無法解析者回傳 None
+    assert [integrateData.convert_program_time_to_slot(v) for v in values] == expected
+
+
+if __name__ == "__main__":
+    test_excel_to_date_matches_legacy()
+    test_excel_to_date_numeric_row()
+    test_extract_ratings_data_matches_legacy()
+    test_convert_program_time_to_slot_matches_legacy()
+    print("✅ integrateData 回歸測試通過")
@@ -0,0 +1,239 @@
+"""
+test_process_acnelson_with_age.py
+
+process_acnelson_with_age 向量化正規化流程的回歸測試，以舊版逐列實作為基準比對結果
+"""
+
+import datetime
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+import process_acnelson_with_age as pa_age
+
+
+def legacy_cleaned_series_name(prog):
+    """舊版逐筆實作（向量化前），作為比對基準"""
+    if pd.isna(prog):
+        return ""
+    s = str(prog).strip()
+    s = re.sub(r"[#＃]{1,2}\s*\d+.*$", "", s)
+    s = re.sub(r"（.*?）|\(.*?\)", "", s)
+    s = re.sub(r"\(第.*?集\)", "", s)
+    s = re.sub(r"首播|（普）|\(普\)", "", s)
+    s = re.sub(r"[\-–—:：\s]+$", "", s)
+    return s.strip()
+
+
+def legacy_weekday_cn_from_date(d):
+    """舊版逐筆實作（向量化前），作為比對基準"""
+    if pd.isna(d):
+        return ""
+    if isinstance(d, str):
+        for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%Y%m%d"):
+            try:
+                dt = datetime.datetime.strptime(d.strip(), fmt)
+                return pa_age.WEEKDAY_CN[dt.weekday()]
+            except Exception:
+                continue
+        try:
+            dt = pd.to_datetime(d)
+            return pa_age.WEEKDAY_CN[dt.weekday()]
+        except Exception:
+            return ""
+    if isinstance(d, (pd.Timestamp, datetime.datetime)):
+        return pa_age.WEEKDAY_CN[d.weekday()]
+    return ""
+
+
+def legacy_parse_time_from_slot(time_slot):
+    """舊版逐筆實作（向量化前），作為比對基準"""
+    if pd.isna(time_slot):
+        return ""
+    slot_str = str(time_slot).strip()
+    if '~' in slot_str:
+        start_time = slot_str.split('~')[0].strip()
+        if ':' in start_time and len(start_time.split(':')) == 2:
+            start_time += ':00'
+        return start_time
+    return slot_str
+
+
+def legacy_normalize_file(path):
+    """舊版以 iterrows 逐列組成 dict 的實作（向量化前），作為比對基準"""
+    out_rows = []
+    xls = pd.read_excel(path, sheet_name=None, engine='openpyxl')
+
+    for sheet_name, df in xls.items():
+        if df.empty or '尼爾森各節目年齡層收視率' not in sheet_name:
+            continue
+        df = df.loc[:, df.notna().any(axis=0)]
+        if '日期' not in df.columns or '節目名稱' not in df.columns:
+            continue
+
+        for _, row in df.iterrows():
+            date_val = row['日期']
+            time_slot_val = row['播出時間'] if '播出時間' in row.index else None
+            prog_val = row['節目名稱']
+            if pd.isna(date_val) or pd.isna(prog_val):
+                continue
+
+            rating = row['4歲以上'] if '4歲以上' in row.index else None
+            row_data = {
+                'Date': pd.to_datetime(date_val).date(),
+                'Weekday': legacy_weekday_cn_from_date(date_val),
+                'Time': legacy_parse_time_from_slot(time_slot_val),
+                'Program': prog_val,
+                'Program_Sheet': f"{path.name}:{sheet_name}",
+                'Time_Slot': time_slot_val if time_slot_val is not None else '',
+                'Rating': float(rating) if pd.notna(rating) else 0.0,
+                'Cleaned_Series_Name': legacy_cleaned_series_name(prog_val),
+            }
+            for age_col in pa_age.AGE_COLUMNS:
+                age_val = row[age_col] if age_col in row.index else None
+                row_data[age_col] = float(age_val) if pd.notna(age_val) else 0.0
+            out_rows.append(row_data)
+
+    return pd.DataFrame(out_rows)
+
+
+PROGRAM_NAMES = [
+    '你也有今天  (第 13 集)(普)',
+    '對你不止是喜歡 首播 (第 15 集)(普)',
+    '神鵰俠侶#7',
+    '神鵰俠侶 ##12(完)',
+    '星漢燦爛＃3',
+    'X - (完)',
+    '  B：(普) ',
+    'D（完）—',
+    '聖鬥士星矢OMEGA 首播 (第 89 集)(普)',
+    '首播',
+    '(普)',
+    '',
+    'A(完)#12',
+    'C 首播 (第 3 集)(普)',
+    'E ##3 (完)',
+    '   ',
+]
+
+TIME_SLOTS = ['00:00~01:00', ' 7:30~8:00 ', '00:30:00~01:00', '12:00', 'abc', None]
+
+
+def test_cleaned_series_name_matches_legacy():
+    """單一合併正規式的清理結果與舊版五段 re.sub 一致（含尾端分隔符號）"""
+    names = PROGRAM_NAMES + [None]
+    programs = pd.Series(names, dtype=object)
+
+    result = pa_age.cleaned_series_names(programs)
+
+    expected = [legacy_cleaned_series_name(p) for p in names]
+    assert list(result) == expected
+    # 單值版本保留舊介面
+    assert [pa_age.cleaned_series_name(p) for p in names] == expected
+
+
+def test_parse_time_from_slot_matches_legacy():
+    """時段字串取開始時間並補秒數，無 '~' 者原樣保留，缺值為空字串"""
+    slots = pd.Series(TIME_SLOTS, dtype=object)
+
+    result = pa_age.parse_times_from_slots(slots)
+
+    expected = [legacy_parse_time_from_slot(s) for s in TIME_SLOTS]
+    assert list(result) == expected
+    # 單值版本保留舊介面
+    assert [pa_age.parse_time_from_slot(s) for s in TIME_SLOTS] == expected
+
+
+def test_weekday_cn_from_date_matches_legacy():
+    """單值版本接受原始日期字串或 datetime，其他型別與無法解析者為空字串"""
+    values = ['2024-01-01', ' 2024/01/02 ', '20240103', 'Jan 4, 2024', 'garbage', '',
+              datetime.datetime(2024, 1, 5), pd.Timestamp('2024-01-06'), datetime.date(2024, 1, 7),
+              45292, None, float('nan'), pd.NaT]
+
+    assert [pa_age.weekday_cn_from_date(v) for v in values] == \
+        [legacy_weekday_cn_from_date(v) for v in values]
+
+
+def test_weekday_cn_from_dates():
+    """向量化版本直接由已解析日期對應星期，NaT 為空字串"""
+    dates = pd.to_datetime(pd.Series(['2024-01-01', '2024-01-06', '2024-01-07', None]))
+
+    assert list(pa_age.weekday_cn_from_dates(dates)) == ['一', '六', '日', '']
+
+
+def write_age_workbook(path):
+    """建立小型年齡層收視活頁簿：日期格式混用、缺值列、缺少部分年齡層欄位"""
+    dates = ['2024-01-01', '2024/01/02', '20240103', datetime.datetime(2024, 1, 4),
+             '2024-01-05', None, '2024-01-07', '2024-01-08', '2024-01-09',
+             '2024-01-10', '2024-01-11', '2024-01-12']
+    programs = PROGRAM_NAMES[:len(dates)]
+    programs[6] = None
+    data = pd.DataFrame({
+        '頻道名稱': '綜合台',
+        '節目名稱': programs,
+        '日期': dates,
+        '播出時間': (TIME_SLOTS * 2)[:len(dates)],
+        '4歲以上': [0.01 * i if i % 5 else None for i in range(len(dates))],
+        '15-44歲': [0.02 * i for i in range(len(dates))],
+        '55歲以上女性': [0.03 * i if i % 3 else None for i in range(len(dates))],
+    })
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        data.to_excel(writer, sheet_name='尼爾森各節目年齡層收視率', index=False)
+        data.to_excel(writer, sheet_name='其他工作表', index=False)
+
+
+def test_normalize_file_matches_legacy():
+    """向量化的 normalize_file 與舊版逐列結果一致（日期、星期、時間、劇名與年齡層欄位）"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'sample.xlsx'
+        write_age_workbook(path)
+
+        expected = legacy_normalize_file(path)
+        result, messages = pa_age.normalize_file(path)
+
+    assert messages == []
+    assert len(result) == len(expected) == 9
+    pd.testing.assert_frame_equal(result.astype({c: 'float64' for c in pa_age.AGE_COLUMNS}),
+                                  expected, check_dtype=False)
+
+
+def test_normalize_file_without_time_slot_column():
+    """缺少播出時間欄位的工作表，Time 與 Time_Slot 皆為空字串（與舊版相同）"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'no_slot.xlsx'
+        pd.DataFrame({'節目名稱': ['神鵰俠侶#7', '星漢燦爛'], '日期': ['2024-01-01', '2024-01-02'],
+                      '4歲以上': [0.1, 0.2]}).to_excel(
+            path, sheet_name='尼爾森各節目年齡層收視率', index=False)
+
+        expected = legacy_normalize_file(path)
+        result, messages = pa_age.normalize_file(path)
+
+    assert messages == []
+    pd.testing.assert_frame_equal(result.astype({c: 'float64' for c in pa_age.AGE_COLUMNS}),
+                                  expected, check_dtype=False)
+
+
+def test_normalize_file_reports_unreadable_file():
+    """無法開啟的檔案回傳空結果與錯誤訊息，由主程序列印"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'broken.xlsx'
+        path.write_text('not a workbook')
+
+        result, messages = pa_age.normalize_file(path)
+
+    assert result.empty
+    assert len(messages) == 1 and messages[0].startswith('Failed to open broken.xlsx')
+
+
+if __name__ == "__main__":
+    test_cleaned_series_name_matches_legacy()
+    test_parse_time_from_slot_matches_legacy()
+    test_weekday_cn_from_date_matches_legacy()
+    test_weekday_cn_from_dates()
+    test_normalize_file_matches_legacy()
+    test_normalize_file_without_time_slot_column()
+    test_normalize_file_reports_unreadable_file()
+    print("✅ process_acnelson_with_age 回歸測試通過")